@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from sqlite_store import ensure_directory
+
+# Bump when the shape or meaning of cached analysis changes, so old entries are ignored
+CACHE_VERSION = 2
+
+
+def content_key(data, filename="", context=""):
+    """Content-addressed key for uploaded bytes (the extension decides how text is extracted)"""
+    # context names the settings the analysis depends on besides the content (e.g. the taxonomy
+    # version), so entries made under other settings are never returned
+    return _digest_key(hashlib.sha256(data).hexdigest(), filename, context)
+
+
+def stream_key(stream, filename="", context="", chunk_size=64 * 1024):
+    """Content-addressed key for an upload stream, hashed in chunks and rewound afterwards"""
+    digest = hashlib.sha256()
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(chunk_size), b""):
+        digest.update(chunk)
+    stream.seek(0)
+    return _digest_key(digest.hexdigest(), filename, context)
+
+
+def _digest_key(digest, filename, context):
+    extension = os.path.splitext(filename)[1].lower()
+    return f"v{CACHE_VERSION}:{context}:{extension}:{digest}"
+
+
+class AnalysisCache:
+    def __init__(self, max_entries=256, db_path=None, max_db_bytes=256 * 1024 * 1024):
+        """Two-tier cache: a bounded in-memory LRU and an optional size-bounded SQLite file"""
+        self.max_entries = max_entries
+        self.max_db_bytes = max_db_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+        if db_path:
+            ensure_directory(db_path)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+            self._db.commit()
+
+    def get(self, key):
+        """Return the cached entry for key, or None"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+            if self._db is None:
+                return None
+
+            row = self._db.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+
+            # Promote disk hits into the memory tier
+            entry = json.loads(row[0])
+            self._remember(key, entry)
+            return entry
+
+    def put(self, key, entry):
+        """Store an entry in both tiers, evicting the least recently used ones"""
+        with self._lock:
+            self._remember(key, entry)
+
+            if self._db is None:
+                return
+
+            value = json.dumps(entry)
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, len(value), time.time())
+            )
+            self._evict_disk()
+            self._db.commit()
+
+    def clear(self):
+        """Drop every cached entry"""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM entries")
+                self._db.commit()
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        """Delete the least recently used rows until the disk tier fits its size budget"""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_db_bytes:
+            return
+
+        rows = self._db.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall()
+        for key, size in rows:
+            if total <= self.max_db_bytes:
+                break
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
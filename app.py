@@ -1,185 +1,135 @@
-from flask import Flask, request, render_template, jsonify, redirect, url_for
+from flask import (
+    Flask, Request, Response, request, render_template, jsonify, redirect, stream_with_context, url_for,
+    abort, before_render_template, g, template_rendered
+)
+import io
 import os
-import docx2txt
-import PyPDF2
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import spacy
-import re
-from collections import Counter
+import json
+import multiprocessing
+import tempfile
+import threading
+import time
+import heapq
+from skill_taxonomy import get_taxonomy
+from nlp_models import warm_up
+from analysis_cache import CACHE_VERSION
+from text_extraction import SPOOL_MAX_SIZE
+from resume_archives import (
+    MAX_MEMBERS, MAX_MEMBER_SIZE, MAX_RATIO, MAX_TOTAL_SIZE, ArchiveError, is_archive, iter_archive
+)
+from resume_pipeline import (
+    BATCH_SCORER, SCORE_WEIGHTS, AnalysisContext, ParsedDocument, collect_resume_documents, get_tfidf_model,
+    iter_resume_documents, load_resume_documents, load_resume_texts, resume_skill_text, store_resume_analysis,
+    use_config, config as pipeline_config
+)
+from batch_jobs import BatchJobQueue, BatchJobStore, DONE, FAILED, RUNNING
+from job_profiles import JobProfileStore, content_hash
+from candidate_index import CandidateIndex
+from instrumentation import METRICS, server_timing
+
+class UploadRequest(Request):
+    """Request that keeps uploaded files in memory, spilling to a temp file only when large"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=app.config['UPLOAD_SPOOL_MAX_SIZE'])
 
 # Initialize Flask app
 app = Flask(__name__)
-app.config['UPLOAD_FOLDER'] = 'uploads/'
-
-# Load NLP model
-nlp = spacy.load("en_core_web_sm")
-
-# Define domain-specific keywords for software engineering
-SOFTWARE_ENGINEERING_DOMAIN = {
-    'software', 'developer', 'engineer', 'programming', 'code', 'java', 'python', 'c++',
-    'algorithm', 'data structure', 'backend', 'frontend', 'full stack', 'api', 'cloud',
-    'devops', 'agile', 'scrum', 'version control', 'git', 'database', 'sql', 'nosql',
-    'machine learning', 'ai', 'computer vision', 'nlp', 'web development', 'mobile development'
-}
-
-def extract_text_from_pdf(file_path):
-    text = ""
-    with open(file_path, 'rb') as file:
-        reader = PyPDF2.PdfReader(file)
-        for page in reader.pages:
-            text += page.extract_text()
-        
-    return text
-
-def extract_text_from_docx(file_path):
-    return docx2txt.process(file_path)
-
-def extract_text_from_txt(file_path):
-    with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-        return file.read()
-
-def extract_text(file_path):
-    if file_path.endswith('.pdf'):
-        return extract_text_from_pdf(file_path)
-    elif file_path.endswith('.docx'):
-        return extract_text_from_docx(file_path)
-    elif file_path.endswith('.txt'):
-        return extract_text_from_txt(file_path)
-    else:
-        return ""
+app.request_class = UploadRequest
+app.config['UPLOAD_SPOOL_MAX_SIZE'] = SPOOL_MAX_SIZE
 
-def extract_keywords(text, top_n=20):
-    """Extract important keywords from text using spaCy"""
-    doc = nlp(text)
-    
-    # Enhanced filtering
-    keywords = [
-        token.lemma_.lower() for token in doc
-        if token.pos_ in ["NOUN", "PROPN"]
-        and not token.is_stop
-        and len(token.text) > 2
-        and token.text.lower() not in {'resume', 'cv', 'improvement'}
-    ]
-    
-    # Add multi-word phrases
-    keywords += [
-        chunk.text.lower() for chunk in doc.noun_chunks
-        if len(chunk.text.split()) > 1
-    ]
-    
-    keyword_freq = Counter(keywords)
-    return keyword_freq.most_common(top_n)
+# Settings of the scoring pipeline (see resume_pipeline.py), read from app.config from now on
+app.config.update(pipeline_config)
+use_config(app.config)
 
-def extract_skills(text):
-    """Extract skills from text by matching against common skills list"""
-    doc = nlp(text.lower())
-    found_skills = set()
-    
-    # Extract single-word skills
-    for token in doc:
-        if token.text.lower() in COMMON_SKILLS:
-            found_skills.add(token.text.lower())
-    
-    # Extract multi-word skills using regex patterns
-    for skill in MULTI_WORD_SKILLS:
-        if re.search(r'\b' + re.escape(skill) + r'\b', text.lower()):
-            found_skills.add(skill)
-            
-    return list(found_skills)
-
-def analyze_resume_structure(text):
-    """Analyze resume structure and provide suggestions"""
-    suggestions = []
-    
-    # Check length
-    words = text.split()
-    if len(words) < 300:
-        suggestions.append("Your resume seems short. Consider adding more details about your experience and skills.")
-    elif len(words) > 1000:
-        suggestions.append("Your resume is quite lengthy. Consider condensing it to highlight your most relevant experiences.")
-    
-    # Check for bullet points
-    if text.count('•') < 5 and text.count('-') < 5:
-        suggestions.append("Consider using bullet points to make your achievements and responsibilities more readable.")
-    
-    # Check for action verbs
-    action_verbs_count = sum(1 for word in words if word.lower() in ACTION_VERBS)
-    if action_verbs_count < 10:
-        suggestions.append("Add more action verbs (like 'achieved', 'managed', 'developed') to make your accomplishments stand out.")
-    
-    # Check for quantifiable achievements
-    numbers = re.findall(r'\b\d+%|\b\d+\b', text)
-    if len(numbers) < 5:
-        suggestions.append("Try to quantify your achievements with numbers (e.g., 'increased sales by 20%').")
-    
-    return suggestions
+# Number of ranked resumes shown on the matcher results page
+app.config['MATCHER_TOP_K'] = 10
 
-def calculate_weighted_similarity(job_text, resume_text):
-    """Calculate a weighted similarity score based on skills, domain, experience, and education"""
-    # Extract skills from job description and resume
-    job_skills = extract_skills(job_text)
-    resume_skills = extract_skills(resume_text)
-    
-    # Calculate skill overlap (partial matching)
-    skill_overlap = len(set(job_skills).intersection(resume_skills)) / len(job_skills) if job_skills else 0
-    
-    # Check domain alignment (less strict)
-    domain_alignment = 1 if is_domain_aligned(resume_text, SOFTWARE_ENGINEERING_DOMAIN) else 0
-    
-    # Check experience and education alignment (new factor)
-    experience_alignment = 1 if "intern" in resume_text.lower() or "experience" in resume_text.lower() else 0
-    education_alignment = 1 if "computer science" in resume_text.lower() or "software engineering" in resume_text.lower() else 0
-    
-    # Weighted similarity score
-    weighted_similarity = (
-        0.5 * skill_overlap + 
-        0.2 * domain_alignment + 
-        0.2 * experience_alignment +  
-        0.1 * education_alignment 
+# Archive uploads (ZIP or tar.gz of resumes) on the batch page. Members are read one at a
+# time from the upload stream, never unpacked to disk, within these limits per archive.
+app.config['ARCHIVE_MAX_MEMBERS'] = MAX_MEMBERS
+app.config['ARCHIVE_MAX_MEMBER_SIZE'] = MAX_MEMBER_SIZE
+app.config['ARCHIVE_MAX_TOTAL_SIZE'] = MAX_TOTAL_SIZE
+app.config['ARCHIVE_MAX_RATIO'] = MAX_RATIO
+
+# Background batch jobs: a local thread pool and a SQLite job store, both started with the app
+app.config['BATCH_JOB_DB'] = os.environ.get('BATCH_JOB_DB', os.path.join('instance', 'batch_jobs.sqlite3'))
+app.config['BATCH_JOB_WORKERS'] = 2
+app.config['BATCH_JOB_CHUNK_SIZE'] = 50
+# A running job without a progress heartbeat for this many seconds lost its worker; the queue
+# checks for such jobs every BATCH_JOB_RECLAIM_INTERVAL seconds and runs them again
+app.config['BATCH_JOB_STALE_AFTER'] = 600
+app.config['BATCH_JOB_RECLAIM_INTERVAL'] = 60
+
+# Stored job description profiles (precomputed job-side analysis), created on first use
+app.config['JOB_PROFILE_DB'] = os.environ.get('JOB_PROFILE_DB', os.path.join('instance', 'job_profiles.sqlite3'))
+
+# Persistent candidate index for re-ranking a stored talent pool, created on first use
+app.config['CANDIDATE_INDEX_DB'] = os.environ.get('CANDIDATE_INDEX_DB', os.path.join('instance', 'candidates.sqlite3'))
+
+# Per-stage timing: totals at /metrics (Prometheus text format) and, optionally, a
+# Server-Timing header on every response. Off by default; disabled stages cost one flag check.
+app.config['METRICS_ENABLED'] = bool(os.environ.get('METRICS_ENABLED'))
+app.config['SERVER_TIMING'] = bool(os.environ.get('SERVER_TIMING'))
+METRICS.enabled = app.config['METRICS_ENABLED']
+
+# NLP models are loaded lazily from the shared registry; set NLP_WARMUP to load them
+# at import time instead (e.g. before gunicorn forks its workers with --preload)
+if os.environ.get('NLP_WARMUP'):
+    warm_up(["keywords"])
+
+def load_resumes(resume_files):
+    """Parse uploaded resumes, reusing the cached analysis of files seen before"""
+    return load_resume_documents(
+        [(resume_file.filename, resume_file.stream) for resume_file in resume_files]
     )
 
-    # to do: currenly, if num experience > required experience, then domain relevance is not accounted for, 
-    # domain alignment comes before the num years experience check, change hierarchy of analysis 
-    
-    return round(weighted_similarity * 100, 2)
+def iter_uploaded_documents(files, archives):
+    """(filename, source) of uploaded resumes, then of each resume inside the uploaded archives"""
+    yield from files
+    for filename, stream in archives:
+        yield from iter_archive(
+            stream, filename,
+            max_members=app.config['ARCHIVE_MAX_MEMBERS'],
+            max_member_size=app.config['ARCHIVE_MAX_MEMBER_SIZE'],
+            max_total_size=app.config['ARCHIVE_MAX_TOTAL_SIZE'],
+            max_ratio=app.config['ARCHIVE_MAX_RATIO']
+        )
 
-def is_domain_aligned(resume_text, domain_keywords):
-    """Check if the resume aligns with the job domain (less strict)"""
-    resume_tokens = set(resume_text.lower().split())
-    domain_overlap = resume_tokens.intersection(domain_keywords)
-    return len(domain_overlap) >= 1  # At least 1 domain-specific keyword
+def _detach_upload(upload):
+    """Take an upload's stream away from the request, which closes its files when it ends"""
+    stream = upload.stream
+    upload.stream = io.BytesIO()
+    return stream
+
+@app.before_request
+def start_request_timing():
+    METRICS.begin_request()
+
+@app.after_request
+def add_server_timing(response):
+    timings = METRICS.end_request()
+    if timings and app.config['SERVER_TIMING']:
+        response.headers['Server-Timing'] = server_timing(timings)
+    return response
+
+@before_render_template.connect_via(app)
+def start_render_timing(sender, template, context, **extra):
+    g.render_started = (time.perf_counter(), time.thread_time())
+
+@template_rendered.connect_via(app)
+def record_render_timing(sender, template, context, **extra):
+    started = g.pop('render_started', None)
+    if started is not None and METRICS.enabled:
+        METRICS.record("render_template", time.perf_counter() - started[0], time.thread_time() - started[1])
+
+@app.route('/metrics')
+def metrics():
+    """Per-stage totals in the Prometheus text exposition format"""
+    if not METRICS.enabled:
+        return jsonify({'error': 'Metrics are disabled; set METRICS_ENABLED to collect them.'}), 404
+    return Response(METRICS.prometheus(), mimetype='text/plain; version=0.0.4')
 
-def generate_improvement_suggestions(job_text, resume_text):
-    """Generate suggestions to improve resume based on job description"""
-    suggestions = []
-    
-    # Extract job skills
-    job_skills = extract_skills(job_text)
-    
-    # Extract resume skills
-    resume_skills = extract_skills(resume_text)
-    
-    # Identify missing skills
-    missing_skills = [skill for skill in job_skills if skill not in resume_skills]
-    
-    # Generate skill suggestions
-    if missing_skills:
-        if len(missing_skills) > 5:
-            suggestions.append(f"Consider adding these key skills: {', '.join(missing_skills[:5])}, and others.")
-        else:
-            suggestions.append(f"Consider adding these key skills: {', '.join(missing_skills)}.")
-    
-    # Check domain alignment
-    if not is_domain_aligned(resume_text, SOFTWARE_ENGINEERING_DOMAIN):
-        suggestions.append("Your resume could better align with the software engineering domain. Consider highlighting relevant technical experience.")
-    
-    # Add structure suggestions
-    structure_suggestions = analyze_resume_structure(resume_text)
-    suggestions.extend(structure_suggestions)
-    
-    return suggestions
-    
 @app.route("/")
 def home():
     return render_template('home.html')
@@ -192,118 +142,654 @@ def batch_analysis():
 def single_analysis():
     return render_template('single_analysis.html')
 
+def _form_job():
+    """The job of a form post: a stored profile by job_id, else the job_description text (or None)"""
+    job_id = request.form.get('job_id')
+    if job_id:
+        job = load_job_profile(job_id)
+        if job is None:
+            abort(404, description="Unknown job profile.")
+        return job
+    return request.form.get('job_description')
+
 @app.route('/matcher', methods=['POST'])
 def matcher():
     if request.method == 'POST':
-        job_description = request.form['job_description']
-        resume_files = request.files.getlist('resumes')
+        job = _form_job()
+        # Resume files and archives of resumes (ZIP or tar.gz) may be uploaded together
+        uploads = [
+            upload for upload in request.files.getlist('resumes') + request.files.getlist('archive')
+            if upload.filename
+        ]
         
-        if not resume_files or not job_description or resume_files[0].filename == '':
+        if not uploads or not job:
             return redirect(url_for('home'))  # Redirect to home page
         
-        # Create upload folder if it doesn't exist
-        if not os.path.exists(app.config['UPLOAD_FOLDER']):
-            os.makedirs(app.config['UPLOAD_FOLDER'])
+        resume_files = [upload for upload in uploads if not is_archive(upload.filename)]
+        archives = [upload for upload in uploads if is_archive(upload.filename)]
         
-        resumes = []
-        resume_texts = []
-        for resume_file in resume_files:
-            filename = os.path.join(app.config['UPLOAD_FOLDER'], resume_file.filename)
-            resume_file.save(filename)
-            
-            # Extract text
-            text = extract_text(filename)
-            resumes.append({
-                'filename': resume_file.filename,
-                'text': text
-            })
-            resume_texts.append(text)
+        # Parse the job description once, and each resume once (or reuse its cached analysis)
+        context = AnalysisContext(job)
+        
+        # Streaming mode: send each score as it is computed, then the ranked summary
+        if request.args.get('stream') or request.form.get('stream'):
+            # The uploads are read now (archives are taken over instead): the request closes its
+            # files before the stream is sent
+            documents = [(resume_file.filename, resume_file.stream.read()) for resume_file in resume_files]
+            archive_streams = [(archive.filename, _detach_upload(archive)) for archive in archives]
+            total = None if archives else len(documents)
+            return Response(stream_with_context(_matcher_events(context, documents, archive_streams, total)),
+                            mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+        
+        if archives:
+            # Archive members are extracted and parsed as they are read from the upload
+            documents = iter_uploaded_documents(
+                [(resume_file.filename, resume_file.stream) for resume_file in resume_files],
+                [(archive.filename, archive.stream) for archive in archives]
+            )
+            try:
+                filenames, cache_keys, parsed_resumes, errors = collect_resume_documents(documents)
+            except ArchiveError as exc:
+                abort(400, description=str(exc))
+        else:
+            filenames = [resume_file.filename for resume_file in resume_files]
+            cache_keys, parsed_resumes, errors = load_resumes(resume_files)
+        
+        # Score the whole batch first, then keep only the top k (ties keep upload order)
+        similarities = context.similarities(parsed_resumes)
+        top = heapq.nlargest(app.config['MATCHER_TOP_K'], range(len(parsed_resumes)),
+                             key=lambda index: similarities[index])
         
-        # Calculate similarities
+        # Suggestions are only worth computing for the resumes that are shown
         results = []
-        for i, resume in enumerate(resumes):
-            similarity = calculate_weighted_similarity(job_description, resume['text'])
-            suggestions = generate_improvement_suggestions(job_description, resume['text'])
-            
+        for index in top:
             results.append({
-                'filename': resume['filename'],
-                'similarity': similarity,
-                'suggestions': suggestions
+                'filename': filenames[index],
+                'similarity': similarities[index],
+                'suggestions': context.suggestions(parsed_resumes[index]),
+                'error': errors[index],
+                'truncated': parsed_resumes[index].truncated
             })
         
-        # Sort results by similarity
-        results.sort(key=lambda x: x['similarity'], reverse=True)
+        store_resume_analysis(cache_keys, parsed_resumes)
         
         return render_template('results.html', 
-                              job_description=job_description, 
-                              results=results[:10])
+                              job_description=context.job.text, 
+                              results=results,
+                              total=len(parsed_resumes))
     
     return redirect(url_for('home'))
 
+def _matcher_events(context, documents, archives=(), total=None):
+    """Server-sent events for the matcher page: one 'score' per resume, then a 'summary'"""
+    # total is None when archives are still to be read; an 'error' event reports an archive
+    # that could not be read or broke a limit, and the summary covers what was scored before it
+    yield f"event: start\ndata: {json.dumps({'total': total})}\n\n"
+    
+    records = {}
+    try:
+        for index, filename, key, parsed_resume, error in iter_resume_documents(
+                iter_uploaded_documents(documents, archives)):
+            similarity = context.similarities([parsed_resume])[0]
+            records[index] = (filename, key, parsed_resume, error, similarity)
+            score = {
+                'index': index,
+                'filename': filename,
+                'similarity': similarity,
+                'error': error,
+                'truncated': parsed_resume.truncated
+            }
+            yield f"event: score\ndata: {json.dumps(score)}\n\n"
+    except ArchiveError as exc:
+        yield f"event: error\ndata: {json.dumps({'error': str(exc)})}\n\n"
+    finally:
+        for _, stream in archives:
+            stream.close()
+    
+    # Same top-k ranking as the rendered page; suggestions only for the survivors
+    order = sorted(records)
+    top = heapq.nlargest(app.config['MATCHER_TOP_K'], order, key=lambda index: records[index][4])
+    results = [
+        {
+            'filename': records[index][0],
+            'similarity': records[index][4],
+            'suggestions': context.suggestions(records[index][2]),
+            'error': records[index][3],
+            'truncated': records[index][2].truncated
+        }
+        for index in top
+    ]
+    store_resume_analysis([records[index][1] for index in order], [records[index][2] for index in order])
+    yield f"event: summary\ndata: {json.dumps({'total': len(records), 'results': results})}\n\n"
+
 @app.route('/analyze', methods=['POST'])
 def analyze_single_resume():
     if request.method == 'POST':
-        job_description = request.form['job_description']
+        job = _form_job()
         
         # Check if file is uploaded
-        if 'resume' not in request.files or request.files['resume'].filename == '':
+        if not job or 'resume' not in request.files or request.files['resume'].filename == '':
             return redirect(url_for('home'))  # Redirect to home page
         
         resume_file = request.files['resume']
         
-        # Create upload folder if it doesn't exist
-        if not os.path.exists(app.config['UPLOAD_FOLDER']):
-            os.makedirs(app.config['UPLOAD_FOLDER'])
-        
-        # Save file
-        filename = os.path.join(app.config['UPLOAD_FOLDER'], resume_file.filename)
-        resume_file.save(filename)
-        
-        # Extract text
-        resume_text = extract_text(filename)
+        # Parse both documents once for scoring and suggestions (reusing cached resume analysis)
+        context = AnalysisContext(job)
+        cache_keys, parsed_resumes, errors = load_resumes([resume_file])
+        parsed_resume = parsed_resumes[0]
         
         # Generate suggestions
-        suggestions = generate_improvement_suggestions(job_description, resume_text)
+        suggestions = context.suggestions(parsed_resume)
         
         # Calculate similarity
-        similarity = calculate_weighted_similarity(job_description, resume_text)
+        similarity = context.similarity(parsed_resume)
+        
+        store_resume_analysis(cache_keys, parsed_resumes)
         
         result = {
             'filename': resume_file.filename,
             'similarity': similarity,
-            'suggestions': suggestions
+            'suggestions': suggestions,
+            'error': errors[0],
+            'truncated': parsed_resume.truncated
         }
         
         return render_template('analyze.html', 
-                               job_description=job_description, 
+                               job_description=context.job.text, 
                                result=result)
     
     return redirect(url_for('home'))
 
-# Common skills database (simplified version)
-COMMON_SKILLS = {
-    'python', 'java', 'javascript', 'html', 'css', 'sql', 'nosql', 'react', 'angular', 'vue', 
-    'node', 'django', 'flask', 'spring', 'docker', 'kubernetes', 'aws', 'azure', 'gcp', 
-    'machine learning', 'data analysis', 'statistics', 'ai', 'nlp', 'computer vision',
-    'leadership', 'communication', 'teamwork', 'project management', 'agile', 'scrum',
-    'testing', 'ci/cd', 'git', 'github', 'gitlab', 'jira', 'excel', 'powerpoint', 'word',
-    'research', 'analysis', 'design', 'marketing', 'sales', 'customer service', 'operations',
-    'finance', 'accounting', 'hr', 'recruitment', 'training'
-}
-
-MULTI_WORD_SKILLS = {
-    'machine learning', 'data science', 'artificial intelligence', 'project management',
-    'business intelligence', 'data analysis', 'natural language processing', 'computer vision',
-    'user experience', 'user interface', 'front end', 'back end', 'full stack',
-    'continuous integration', 'continuous deployment', 'version control'
-}
-
-ACTION_VERBS = {
-    'achieved', 'improved', 'trained', 'managed', 'created', 'resolved', 'negotiated',
-    'presented', 'developed', 'implemented', 'designed', 'launched', 'increased',
-    'decreased', 'reduced', 'expanded', 'delivered', 'generated', 'led', 'organized',
-    'produced', 'supervised', 'streamlined', 'strengthened', 'transformed'
-}
+# JSON scoring API for ATS integrations
+
+class ApiError(Exception):
+    """Invalid API request, reported to the client as a JSON 400 response"""
+
+@app.errorhandler(ApiError)
+def handle_api_error(error):
+    return jsonify({'error': str(error)}), 400
+
+def _api_options():
+    """Options may be sent in the query string, the form or the JSON body"""
+    options = dict(request.args.items())
+    if request.is_json:
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict):
+            raise ApiError("The request body must be a JSON object.")
+        options.update(payload)
+    else:
+        options.update(request.form.items())
+    return options
+
+def _int_option(options, name, default=None, minimum=0):
+    value = options.get(name, default)
+    if value is None or value == '':
+        return default
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ApiError(f"'{name}' must be an integer.")
+    if value < minimum:
+        raise ApiError(f"'{name}' must be at least {minimum}.")
+    return value
+
+def _bool_option(options, name):
+    value = options.get(name, False)
+    if isinstance(value, str):
+        return value.lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
+
+def _json_resume_entries(entries, field):
+    """Validate pre-extracted resumes sent as JSON and return (resume_id, text) pairs"""
+    if not isinstance(entries, list) or not entries:
+        raise ApiError(f"'{field}' must contain at least one resume.")
+    
+    resumes = []
+    for index, entry in enumerate(entries):
+        if isinstance(entry, str):
+            entry = {'text': entry}
+        if not isinstance(entry, dict) or not isinstance(entry.get('text'), str):
+            raise ApiError(f"Each entry of '{field}' needs a 'text' string.")
+        resume_id = str(entry.get('id') or entry.get('filename') or f"resume-{index + 1}")
+        resumes.append((resume_id, entry['text']))
+    return resumes
+
+def _api_resumes(options, field):
+    """Load the resumes of an API request, from uploaded files or pre-extracted JSON text"""
+    if request.is_json:
+        entries = options.get(field)
+        if field == 'resume':
+            entries = [entries] if entries else []
+            if not entries and options.get('resume_text'):
+                entries = [options['resume_text']]
+        resumes = _json_resume_entries(entries, field)
+        
+        cache_keys, parsed_resumes = load_resume_texts([text for _, text in resumes])
+        return [resume_id for resume_id, _ in resumes], cache_keys, parsed_resumes, [None] * len(resumes)
+    
+    resume_files = [resume_file for resume_file in request.files.getlist(field) if resume_file.filename]
+    if not resume_files:
+        raise ApiError(f"Upload at least one file in '{field}'.")
+    cache_keys, parsed_resumes, errors = load_resumes(resume_files)
+    return [resume_file.filename for resume_file in resume_files], cache_keys, parsed_resumes, errors
+
+def _api_job_description(options):
+    job_description = options.get('job_description')
+    if not isinstance(job_description, str) or not job_description.strip():
+        raise ApiError("'job_description' is required.")
+    return job_description
+
+def _api_job(options):
+    """The job of a request: a stored profile's parsed document by 'job_id', or the posted text"""
+    job_id = options.get('job_id')
+    if job_id:
+        job = load_job_profile(str(job_id))
+        if job is None:
+            raise ApiError(f"Unknown job_id '{job_id}'.")
+        return job
+    return _api_job_description(options)
+
+def _api_context(options):
+    return AnalysisContext(_api_job(options))
+
+def _api_result(context, resume_id, parsed_resume, error, similarity=None, include_analysis=False):
+    """Machine-readable score, skill match and suggestions for one resume"""
+    matched_skills, missing_skills = context.skill_match(parsed_resume)
+    result = {
+        'id': resume_id,
+        'similarity': context.similarity(parsed_resume) if similarity is None else similarity,
+        'matched_skills': matched_skills,
+        'missing_skills': missing_skills,
+        'suggestions': context.suggestions(parsed_resume),
+        'error': error,
+        'truncated': parsed_resume.truncated
+    }
+    if include_analysis:
+        result['structure'] = parsed_resume.structure
+        result['formatting'] = parsed_resume.formatting
+    return result
+
+@app.route('/api/v1/score', methods=['POST'])
+def api_score():
+    """Score one resume against a job description"""
+    options = _api_options()
+    context = _api_context(options)
+    resume_ids, cache_keys, parsed_resumes, errors = _api_resumes(options, 'resume')
+    if len(parsed_resumes) != 1:
+        raise ApiError("Send exactly one resume; use /api/v1/score/bulk for several.")
+    
+    result = _api_result(context, resume_ids[0], parsed_resumes[0], errors[0],
+                         include_analysis=_bool_option(options, 'include_analysis'))
+    store_resume_analysis(cache_keys, parsed_resumes)
+    return jsonify({'result': result})
+
+@app.route('/api/v1/score/bulk', methods=['POST'])
+def api_score_bulk():
+    """Score and rank many resumes against one job description"""
+    options = _api_options()
+    context = _api_context(options)
+    resume_ids, cache_keys, parsed_resumes, errors = _api_resumes(options, 'resumes')
+    
+    # Rank on the score alone; the full result (suggestions, analysis) is built only for
+    # the requested page
+    scores = context.similarities(parsed_resumes)
+    ranking = sorted(range(len(scores)), key=lambda index: scores[index], reverse=True)
+    
+    top_k = _int_option(options, 'top_k', minimum=1)
+    if top_k is not None:
+        ranking = ranking[:top_k]
+    offset = _int_option(options, 'offset', default=0)
+    limit = _int_option(options, 'limit', minimum=1)
+    page = ranking[offset:offset + limit] if limit is not None else ranking[offset:]
+    
+    include_analysis = _bool_option(options, 'include_analysis')
+    results = []
+    for rank, index in enumerate(page, start=offset + 1):
+        result = _api_result(context, resume_ids[index], parsed_resumes[index], errors[index],
+                             similarity=scores[index], include_analysis=include_analysis)
+        result['rank'] = rank
+        results.append(result)
+    
+    store_resume_analysis(cache_keys, parsed_resumes)
+    return jsonify({
+        'total': len(parsed_resumes),
+        'ranked': len(ranking),
+        'offset': offset,
+        'count': len(results),
+        'results': results
+    })
+
+# Background batch jobs for large screenings
+
+_batch_queue = None
+_batch_queue_pid = None
+_batch_queue_lock = threading.Lock()
+
+def get_batch_queue():
+    """Return the process-wide batch job queue, creating it (and its store) on first use"""
+    global _batch_queue, _batch_queue_pid
+    with _batch_queue_lock:
+        # A server that forks its workers after importing the app leaves them without the queue's threads
+        if _batch_queue is None or _batch_queue_pid != os.getpid():
+            _batch_queue_pid = os.getpid()
+            _batch_queue = BatchJobQueue(
+                BatchJobStore(app.config['BATCH_JOB_DB']),
+                run_batch_job,
+                max_workers=app.config['BATCH_JOB_WORKERS'],
+                stale_after=app.config['BATCH_JOB_STALE_AFTER'],
+                reclaim_interval=app.config['BATCH_JOB_RECLAIM_INTERVAL']
+            )
+    return _batch_queue
+
+def run_batch_job(job_description, profile_id, read_inputs, total, report_progress):
+    """Score a stored batch chunk by chunk with the same extraction and scoring as the API"""
+    # A job submitted with a profile reuses its stored analysis; the text covers a deleted profile
+    job = load_job_profile(profile_id) if profile_id else None
+    context = AnalysisContext(job or job_description)
+    chunk_size = app.config['BATCH_JOB_CHUNK_SIZE']
+    results = []
+    
+    for offset in range(0, total, chunk_size):
+        documents = read_inputs(offset, chunk_size)
+        cache_keys = [None] * len(documents)
+        parsed_resumes = [None] * len(documents)
+        errors = [None] * len(documents)
+        # Every parsed resume is a heartbeat, so a run is never taken for dead in the middle of a chunk
+        parsed = iter_resume_documents((filename, data) for _, filename, data in documents)
+        for processed, (index, _, key, parsed_resume, error) in enumerate(parsed, start=offset + 1):
+            cache_keys[index], parsed_resumes[index], errors[index] = key, parsed_resume, error
+            report_progress(processed)
+        
+        similarities = context.similarities(parsed_resumes)
+        for (resume_id, _, _), parsed_resume, error, similarity in zip(documents, parsed_resumes, errors, similarities):
+            results.append(_api_result(context, resume_id, parsed_resume, error, similarity=similarity))
+        store_resume_analysis(cache_keys, parsed_resumes)
+    
+    results.sort(key=lambda result: result['similarity'], reverse=True)
+    for rank, result in enumerate(results, start=1):
+        result['rank'] = rank
+    return results
+
+def _job_status(job):
+    return dict(
+        job,
+        status_url=url_for('api_job_status', job_id=job['id']),
+        results_url=url_for('api_job_results', job_id=job['id']),
+        events_url=url_for('api_job_events', job_id=job['id'])
+    )
+
+@app.route('/api/v1/jobs', methods=['POST'])
+def api_submit_job():
+    """Queue a batch screening and return its job ID right away"""
+    options = _api_options()
+    job = _api_job(options)
+    if isinstance(job, ParsedDocument):
+        job_description, profile_id = job.text, str(options['job_id'])
+    else:
+        job_description, profile_id = job, None
+    
+    # Inputs are stored as raw bytes; pre-extracted text is treated as a .txt upload
+    if request.is_json:
+        documents = [
+            (resume_id, 'resume.txt', text.encode('utf-8'))
+            for resume_id, text in _json_resume_entries(options.get('resumes'), 'resumes')
+        ]
+    else:
+        resume_files = [resume_file for resume_file in request.files.getlist('resumes') if resume_file.filename]
+        if not resume_files:
+            raise ApiError("Upload at least one file in 'resumes'.")
+        documents = [
+            (resume_file.filename, resume_file.filename, resume_file.stream.read())
+            for resume_file in resume_files
+        ]
+    
+    queue = get_batch_queue()
+    job_id = queue.submit(job_description, documents, profile_id)
+    return jsonify(_job_status(queue.store.get(job_id))), 202
+
+@app.route('/api/v1/jobs/<job_id>')
+def api_job_status(job_id):
+    job = get_batch_queue().store.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job.'}), 404
+    return jsonify(_job_status(job))
+
+@app.route('/api/v1/jobs/<job_id>/results')
+def api_job_results(job_id):
+    job = get_batch_queue().store.get(job_id, with_results=True)
+    if job is None:
+        return jsonify({'error': 'Unknown job.'}), 404
+    if job['status'] != DONE:
+        return jsonify(_job_status(dict(job, results=None))), 409
+    
+    options = _api_options()
+    offset = _int_option(options, 'offset', default=0)
+    limit = _int_option(options, 'limit', minimum=1)
+    results = job['results']
+    page = results[offset:offset + limit] if limit is not None else results[offset:]
+    return jsonify({
+        'total': len(results),
+        'offset': offset,
+        'count': len(page),
+        'results': page
+    })
+
+@app.route('/api/v1/jobs/<job_id>/events')
+def api_job_events(job_id):
+    """Stream a job's progress as server-sent events until it finishes (or its worker is gone)"""
+    queue = get_batch_queue()
+    store = queue.store
+    if store.get(job_id) is None:
+        return jsonify({'error': 'Unknown job.'}), 404
+    
+    def events():
+        last = None
+        while True:
+            job = store.get(job_id)
+            state = (job['status'], job['processed'])
+            if state != last:
+                last = state
+                yield f"event: progress\ndata: {json.dumps(job)}\n\n"
+            if job['status'] in (DONE, FAILED):
+                return
+            # No heartbeat for stale_after seconds: the worker died, so the stream would never end.
+            # The queue runs the job again; clients can reconnect to follow the new run.
+            if job['status'] == RUNNING and time.time() - job['updated'] > queue.stale_after:
+                error = {'error': 'The job stopped reporting progress.', 'job': job}
+                yield f"event: error\ndata: {json.dumps(error)}\n\n"
+                return
+            time.sleep(1)
+    
+    return Response(events(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+# Job description profiles: analyzed once, then referenced by ID in scoring requests
+
+_job_profiles = None
+_job_profiles_lock = threading.Lock()
+
+def get_job_profiles():
+    """Return the process-wide job profile store, creating it on first use"""
+    global _job_profiles
+    with _job_profiles_lock:
+        if _job_profiles is None:
+            _job_profiles = JobProfileStore(app.config['JOB_PROFILE_DB'])
+    return _job_profiles
+
+def job_profile_version():
+    """Version a stored profile analysis must match; a new taxonomy changes the job's skills"""
+    return f"{CACHE_VERSION}:{get_taxonomy().version}"
+
+def analyze_job_description(text):
+    """Parse a job description with all the job-side analysis a profile stores"""
+    job = ParsedDocument(text)
+    # Computed now so they are stored with the profile
+    job.keywords
+    job.experience_requirements
+    job.terms
+    if SCORE_WEIGHTS['semantic']:
+        get_tfidf_model().partial_fit([text])
+    return job
+
+def load_job_profile(profile_id):
+    """The parsed job description of a profile, re-analyzed if it predates the current version; None if unknown"""
+    store = get_job_profiles()
+    profile = store.get(profile_id)
+    if profile is None:
+        return None
+    
+    version = job_profile_version()
+    if profile['version'] != version:
+        job = analyze_job_description(profile['analysis']['text'])
+        store.update(profile_id, job.text, job.to_dict(), version)
+        return job
+    return ParsedDocument.from_dict(profile['analysis'])
+
+def _job_profile(profile_id, job):
+    return {
+        'job_id': profile_id,
+        'content_hash': content_hash(job.text),
+        'skills': job.skills,
+        'keywords': [keyword for keyword, _ in job.keywords],
+        'experience_requirements': job.experience_requirements,
+        'required_years': job.required_years,
+        'url': url_for('api_job_profile', profile_id=profile_id)
+    }
+
+@app.route('/api/v1/job-profiles', methods=['POST'])
+def api_create_job_profile():
+    """Analyze a job description once and store it; scoring requests then send its job_id"""
+    options = _api_options()
+    job_description = _api_job_description(options)
+    store = get_job_profiles()
+    
+    # The same text always maps to the same profile
+    profile_id = store.find(content_hash(job_description))
+    if profile_id is not None:
+        job = load_job_profile(profile_id)
+        if job is not None:
+            return jsonify(_job_profile(profile_id, job))
+    
+    job = analyze_job_description(job_description)
+    profile_id = store.create(job.text, job.to_dict(), job_profile_version())
+    return jsonify(_job_profile(profile_id, job)), 201
+
+@app.route('/api/v1/job-profiles/<profile_id>', methods=['GET'])
+def api_job_profile(profile_id):
+    job = load_job_profile(profile_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job profile.'}), 404
+    return jsonify(_job_profile(profile_id, job))
+
+@app.route('/api/v1/job-profiles/<profile_id>', methods=['PUT'])
+def api_update_job_profile(profile_id):
+    """Replace a profile's job description; its analysis is redone only if the content changed"""
+    options = _api_options()
+    job_description = _api_job_description(options)
+    store = get_job_profiles()
+    profile = store.get(profile_id)
+    if profile is None:
+        return jsonify({'error': 'Unknown job profile.'}), 404
+    
+    if profile['content_hash'] == content_hash(job_description):
+        job = load_job_profile(profile_id)
+    else:
+        job = analyze_job_description(job_description)
+        store.update(profile_id, job.text, job.to_dict(), job_profile_version())
+    return jsonify(_job_profile(profile_id, job))
+
+@app.route('/api/v1/job-profiles/<profile_id>', methods=['DELETE'])
+def api_delete_job_profile(profile_id):
+    if not get_job_profiles().delete(profile_id):
+        return jsonify({'error': 'Unknown job profile.'}), 404
+    return jsonify({'removed': profile_id})
+
+# Persistent candidate index
+
+_candidate_index = None
+_candidate_index_version = None
+_candidate_index_lock = threading.Lock()
+
+def get_candidate_index():
+    """Return the process-wide candidate index, opening it on first use"""
+    global _candidate_index, _candidate_index_version
+    taxonomy = get_taxonomy()
+    with _candidate_index_lock:
+        # Skill bitsets cover every skill of the taxonomy, so a new taxonomy version reopens the
+        # index (which re-packs the bitsets for the new vocabulary)
+        if _candidate_index is None or _candidate_index_version != taxonomy.version:
+            _candidate_index = CandidateIndex(app.config['CANDIDATE_INDEX_DB'], taxonomy.skills())
+            _candidate_index_version = taxonomy.version
+    return _candidate_index
+
+def index_candidates(candidate_ids, parsed_resumes):
+    """Store parsed resumes in the candidate index under the given IDs"""
+    index = get_candidate_index()
+    taxonomy = get_taxonomy()
+    if SCORE_WEIGHTS['semantic']:
+        get_tfidf_model().partial_fit(parsed_resume.text for parsed_resume in parsed_resumes)
+    sections = [
+        parsed_resume.sections if app.config['SKILL_SECTIONS'] else None for parsed_resume in parsed_resumes
+    ]
+    return index.add_many(
+        (candidate_id, parsed_resume.text, taxonomy.find(resume_skill_text(parsed_resume.text, resume_sections)),
+         parsed_resume.alignment, parsed_resume.tenure_years)
+        for candidate_id, parsed_resume, resume_sections in zip(candidate_ids, parsed_resumes, sections)
+    )
+
+@app.route('/api/v1/candidates', methods=['POST'])
+def api_add_candidates():
+    """Add resumes (uploaded files or JSON text) to the candidate index"""
+    options = _api_options()
+    candidate_ids, cache_keys, parsed_resumes, errors = _api_resumes(options, 'resumes')
+    
+    # Files that could not be read are reported instead of being indexed as empty resumes
+    indexable = [index for index, error in enumerate(errors) if error is None]
+    added = index_candidates([candidate_ids[index] for index in indexable],
+                             [parsed_resumes[index] for index in indexable])
+    store_resume_analysis(cache_keys, parsed_resumes)
+    return jsonify({
+        'added': added,
+        'total': len(get_candidate_index()),
+        'errors': [{'id': candidate_ids[index], 'error': error} for index, error in enumerate(errors) if error]
+    })
+
+@app.route('/api/v1/candidates/<path:candidate_id>', methods=['DELETE'])
+def api_remove_candidate(candidate_id):
+    get_candidate_index().remove(candidate_id)
+    return jsonify({'removed': candidate_id})
+
+@app.route('/api/v1/candidates/rank', methods=['POST'])
+def api_rank_candidates():
+    """Rank the whole candidate index against a job description and return the top k"""
+    options = _api_options()
+    context = _api_context(options)
+    job = context.job
+    top_k = _int_option(options, 'top_k', default=10, minimum=1)
+    
+    semantic = None
+    if SCORE_WEIGHTS['semantic']:
+        semantic = lambda terms: get_tfidf_model().similarities(job.term_row, terms, cache=True)
+    
+    index = get_candidate_index()
+    results = []
+    ranked = index.rank(job.skills, BATCH_SCORER, top_k, semantic, required_years=job.required_years)
+    for rank, (candidate_id, similarity) in enumerate(ranked, start=1):
+        candidate_skills = set(index.get(candidate_id)['skills'])
+        results.append({
+            'id': candidate_id,
+            'rank': rank,
+            'similarity': similarity,
+            'matched_skills': sorted(skill for skill in job.skills if skill in candidate_skills),
+            'missing_skills': sorted(skill for skill in job.skills if skill not in candidate_skills)
+        })
+    
+    return jsonify({'total': len(index), 'count': len(results), 'results': results})
+
+# Start the batch job queue with the app, so jobs left queued or running by a previous process
+# resume without waiting for a request to the jobs API. Processes started by multiprocessing
+# (extraction workers importing the main module) never run jobs.
+if multiprocessing.parent_process() is None:
+    get_batch_queue()
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
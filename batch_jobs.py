@@ -0,0 +1,245 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlite_store import connect, ensure_directory
+
+# Job states, in the order a job moves through them
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class BatchJobStore:
+    def __init__(self, db_path):
+        """Persistent SQLite store for batch screening jobs and their inputs"""
+        self.db_path = db_path
+        ensure_directory(db_path)
+
+        with connect(self.db_path) as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT NOT NULL, job_description TEXT NOT NULL, "
+                "total INTEGER NOT NULL, processed INTEGER NOT NULL DEFAULT 0, "
+                "results TEXT, error TEXT, created REAL NOT NULL, updated REAL NOT NULL, profile_id TEXT, "
+                "run_token TEXT)"
+            )
+            # Stores created before jobs could reference a job profile (or had run tokens) get the
+            # columns, empty for existing jobs
+            columns = [column[1] for column in db.execute("PRAGMA table_info(jobs)")]
+            for column in ("profile_id", "run_token"):
+                if column not in columns:
+                    db.execute(f"ALTER TABLE jobs ADD COLUMN {column} TEXT")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS job_inputs ("
+                "job_id TEXT NOT NULL, position INTEGER NOT NULL, resume_id TEXT NOT NULL, "
+                "filename TEXT NOT NULL, data BLOB NOT NULL, PRIMARY KEY (job_id, position))"
+            )
+
+    def create(self, job_description, documents, profile_id=None):
+        """Store a new job with its (resume_id, filename, data) inputs and return its ID"""
+        # profile_id names the job profile the job description comes from, if any
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with connect(self.db_path) as db:
+            db.execute(
+                "INSERT INTO jobs (id, status, job_description, profile_id, total, created, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, job_description, profile_id, len(documents), now, now)
+            )
+            db.executemany(
+                "INSERT INTO job_inputs (job_id, position, resume_id, filename, data) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (job_id, position, resume_id, filename, sqlite3.Binary(data))
+                    for position, (resume_id, filename, data) in enumerate(documents)
+                ]
+            )
+        return job_id
+
+    def claim(self, job_id, stale_after=None):
+        """Atomically move a queued (or stale running) job to running; the new run's token, or None if taken"""
+        # Progress, results and failures are only recorded with the token of the latest claim, so
+        # a run whose job was reclaimed from it can no longer touch the job
+        token = uuid.uuid4().hex
+        now = time.time()
+        with connect(self.db_path) as db:
+            if stale_after is None:
+                cursor = db.execute(
+                    "UPDATE jobs SET status = ?, run_token = ?, updated = ? WHERE id = ? AND status = ?",
+                    (RUNNING, token, now, job_id, QUEUED)
+                )
+            else:
+                cursor = db.execute(
+                    "UPDATE jobs SET status = ?, run_token = ?, updated = ? WHERE id = ? AND "
+                    "(status = ? OR (status = ? AND updated < ?))",
+                    (RUNNING, token, now, job_id, QUEUED, RUNNING, now - stale_after)
+                )
+            return token if cursor.rowcount == 1 else None
+
+    def inputs(self, job_id, offset=0, limit=None):
+        """Load a slice of a job's inputs as (resume_id, filename, data) tuples"""
+        with connect(self.db_path) as db:
+            rows = db.execute(
+                "SELECT resume_id, filename, data FROM job_inputs WHERE job_id = ? "
+                "ORDER BY position LIMIT ? OFFSET ?",
+                (job_id, -1 if limit is None else limit, offset)
+            ).fetchall()
+        return [(resume_id, filename, bytes(data)) for resume_id, filename, data in rows]
+
+    def job_description(self, job_id):
+        """Return the job description text a job screens against"""
+        with connect(self.db_path) as db:
+            return db.execute("SELECT job_description FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+
+    def progress(self, job_id, token, processed):
+        """Record how many resumes a run has processed (doubles as a heartbeat); False if the run lost the job"""
+        with connect(self.db_path) as db:
+            cursor = db.execute(
+                "UPDATE jobs SET processed = ?, updated = ? WHERE id = ? AND run_token = ?",
+                (processed, time.time(), job_id, token)
+            )
+            return cursor.rowcount == 1
+
+    def finish(self, job_id, token, results):
+        """Store the results of a run that still holds its job and drop the inputs; False if it lost the job"""
+        with connect(self.db_path) as db:
+            cursor = db.execute(
+                "UPDATE jobs SET status = ?, processed = total, results = ?, updated = ? "
+                "WHERE id = ? AND run_token = ?",
+                (DONE, json.dumps(results), time.time(), job_id, token)
+            )
+            if cursor.rowcount != 1:
+                return False
+            db.execute("DELETE FROM job_inputs WHERE job_id = ?", (job_id,))
+            return True
+
+    def fail(self, job_id, token, error):
+        """Mark a job as failed by a run that still holds it and drop the inputs; False if it lost the job"""
+        with connect(self.db_path) as db:
+            cursor = db.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated = ? WHERE id = ? AND run_token = ?",
+                (FAILED, error, time.time(), job_id, token)
+            )
+            if cursor.rowcount != 1:
+                return False
+            db.execute("DELETE FROM job_inputs WHERE job_id = ?", (job_id,))
+            return True
+
+    def get(self, job_id, with_results=False):
+        """Return a job's status as a dict (optionally with its results), or None"""
+        columns = "id, status, profile_id, total, processed, error, created, updated"
+        if with_results:
+            columns += ", results"
+        with connect(self.db_path) as db:
+            db.row_factory = sqlite3.Row
+            row = db.execute(f"SELECT {columns} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+
+        job = dict(row)
+        if with_results:
+            job["results"] = json.loads(job["results"]) if job["results"] else None
+        return job
+
+    def unfinished(self, stale_after=None):
+        """IDs of jobs that are queued or running, oldest first (with stale_after, only those idle that long)"""
+        # updated is the last claim or progress heartbeat, so idle jobs lost their worker
+        updated_before = time.time() - stale_after if stale_after is not None else float("inf")
+        with connect(self.db_path) as db:
+            rows = db.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) AND updated < ? ORDER BY created",
+                (QUEUED, RUNNING, updated_before)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+
+class RunSuperseded(Exception):
+    """Raised in a job's handler once the job was reclaimed by another run"""
+
+
+class BatchJobQueue:
+    def __init__(self, store, handler, max_workers=2, stale_after=600, reclaim_interval=60):
+        """Run batch jobs on a local worker pool (no external broker)"""
+        # handler(job_description, profile_id, read_inputs(offset, limit), total, report_progress(processed))
+        # returns the job's JSON-serializable results
+        self.store = store
+        self.handler = handler
+        self.stale_after = stale_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="batch-job")
+        # Jobs submitted to this process's pool and not finished yet
+        self._active = set()
+        self._active_lock = threading.Lock()
+
+        # Pick up jobs left behind by a previous process (queued, or running without a heartbeat),
+        # then keep picking up those of workers that die later (another process crashing mid-job)
+        self._reclaim(self.store.unfinished())
+        self._reclaimer = threading.Thread(
+            target=self._reclaim_loop, args=(reclaim_interval,), name="batch-job-reclaim", daemon=True
+        )
+        self._reclaimer.start()
+
+    def submit(self, job_description, documents, profile_id=None):
+        """Queue a batch of (resume_id, filename, data) documents and return the job ID"""
+        job_id = self.store.create(job_description, documents, profile_id)
+        with self._active_lock:
+            self._active.add(job_id)
+        self._executor.submit(self._run, job_id)
+        return job_id
+
+    def _reclaim(self, job_ids):
+        for job_id in job_ids:
+            with self._active_lock:
+                if job_id in self._active:
+                    continue
+                self._active.add(job_id)
+            self._executor.submit(self._run, job_id, self.stale_after)
+
+    def _reclaim_loop(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self._reclaim(self.store.unfinished(stale_after=self.stale_after))
+            except sqlite3.Error:
+                # A busy or briefly unavailable store is checked again next time
+                continue
+
+    def _run(self, job_id, stale_after=None):
+        """Pool task: process one job, then let the reclaimer consider it again"""
+        try:
+            self._process(job_id, stale_after)
+        finally:
+            with self._active_lock:
+                self._active.discard(job_id)
+
+    def _process(self, job_id, stale_after):
+        """Process one job: the handler reads inputs in slices and reports progress as it goes"""
+        token = self.store.claim(job_id, stale_after=stale_after)
+        if token is None:
+            return
+
+        def report_progress(processed):
+            # A run that was taken for dead and reclaimed stops at its next heartbeat
+            if not self.store.progress(job_id, token, processed):
+                raise RunSuperseded(job_id)
+
+        job = self.store.get(job_id)
+        try:
+            results = self.handler(
+                self.store.job_description(job_id),
+                job["profile_id"],
+                lambda offset, limit: self.store.inputs(job_id, offset, limit),
+                job["total"],
+                report_progress
+            )
+        except RunSuperseded:
+            return
+        except Exception as exc:
+            self.store.fail(job_id, token, f"{type(exc).__name__}: {exc}")
+            return
+
+        self.store.finish(job_id, token, results)
@@ -0,0 +1,237 @@
+"""Score a directory (or glob) of resumes against job descriptions offline, across all cores.
+
+    python batch_score.py --job backend.txt --job data.pdf resumes/ "archive/**/*.pdf" -o scores.jsonl
+    python batch_score.py --job backend.txt resumes/ -o scores.csv --analysis --continue
+
+Each resume is extracted, parsed and scored once per job in a worker process, with the same
+pipeline as the web app (resume_pipeline.py, without the app itself). Results are appended to the output (JSONL or CSV, by extension
+or --format) as soon as a chunk finishes. With --continue the (resume, job) pairs already in
+the output are skipped, so an interrupted run picks up where it stopped.
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from resume_archives import RESUME_EXTENSIONS
+from text_extraction import extract_text
+
+FIELDS = ["resume", "job", "similarity", "matched_skills", "missing_skills", "error", "truncated"]
+ANALYSIS_FIELDS = ["structure", "formatting"]
+
+# Per-worker state, set up once by _init_worker
+_contexts = None
+_with_analysis = False
+
+
+def find_resumes(patterns):
+    """Sorted resume paths from files, directories (searched recursively) and glob patterns"""
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for directory, _, filenames in os.walk(pattern):
+                paths.update(os.path.join(directory, filename) for filename in filenames)
+        else:
+            paths.update(glob.glob(pattern, recursive=True) if glob.has_magic(pattern) else [pattern])
+    return sorted(path for path in paths if path.lower().endswith(RESUME_EXTENSIONS) and os.path.isfile(path))
+
+
+def load_jobs(paths):
+    """{job id: text} for job description files; the ID is the file name without its extension"""
+    jobs = {}
+    for path in paths:
+        job_id = os.path.splitext(os.path.basename(path))[0]
+        if job_id in jobs:
+            job_id = path
+        jobs[job_id] = _read_job(path)
+    return jobs
+
+
+def _read_job(path):
+    # Resume formats go through the same extraction as resumes; anything else is UTF-8 text
+    if path.lower().endswith(RESUME_EXTENSIONS):
+        return extract_text(path)
+    with open(path, encoding="utf-8") as file:
+        return file.read()
+
+
+def read_done(path, output_format):
+    """(resume, job) pairs already written to an output file, dropping a half-written last line"""
+    if not os.path.exists(path):
+        return set()
+
+    # A run killed mid-write leaves a partial line; cut the file back to its last full line
+    with open(path, "rb+") as file:
+        data = file.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            file.truncate(end)
+            data = data[:end]
+
+    lines = data.decode("utf-8").splitlines()
+    if output_format == "csv":
+        rows = csv.DictReader(lines)
+    else:
+        rows = (json.loads(line) for line in lines if line.strip())
+    return {(row["resume"], row["job"]) for row in rows}
+
+
+def _init_worker(jobs, with_analysis):
+    global _contexts, _with_analysis
+    import resume_pipeline
+
+    # Workers run in parallel already; each gets one extraction process, so a hanging file still times out
+    resume_pipeline.extraction_pool.max_workers = 1
+    _contexts = {job_id: resume_pipeline.AnalysisContext(text) for job_id, text in jobs.items()}
+    _with_analysis = with_analysis
+
+
+def _score_chunk(tasks):
+    """Worker task: score (path, job ids) tasks; returns (path, records) per resume"""
+    import resume_pipeline
+
+    documents = []
+    read_errors = []
+    for path, _ in tasks:
+        try:
+            with open(path, "rb") as file:
+                documents.append((path, file.read()))
+            read_errors.append(None)
+        except OSError as exc:
+            documents.append((path, b""))
+            read_errors.append(f"Could not read file: {exc}")
+
+    # Cached analyses (with ANALYSIS_CACHE_PATH set) make unchanged resumes cheap on a re-screen
+    cache_keys, parsed_resumes, errors = resume_pipeline.load_resume_documents(documents)
+    errors = [read_error or error for read_error, error in zip(read_errors, errors)]
+
+    records = {path: [] for path, _ in tasks}
+    for job_id, context in _contexts.items():
+        positions = [position for position, (_, job_ids) in enumerate(tasks) if job_id in job_ids]
+        if not positions:
+            continue
+        similarities = context.similarities([parsed_resumes[position] for position in positions])
+        for position, similarity in zip(positions, similarities):
+            path = tasks[position][0]
+            parsed_resume = parsed_resumes[position]
+            matched_skills, missing_skills = context.skill_match(parsed_resume)
+            record = {
+                "resume": path,
+                "job": job_id,
+                "similarity": similarity,
+                "matched_skills": matched_skills,
+                "missing_skills": missing_skills,
+                "error": errors[position],
+                "truncated": parsed_resume.truncated
+            }
+            if _with_analysis:
+                record["structure"] = parsed_resume.structure
+                record["formatting"] = parsed_resume.formatting
+            records[path].append(record)
+
+    resume_pipeline.store_resume_analysis(cache_keys, parsed_resumes)
+    return list(records.items())
+
+
+class ResultWriter:
+    def __init__(self, path, output_format, with_analysis):
+        """Append-only JSONL or CSV output; every resume's records go out in one flushed write"""
+        self.output_format = output_format
+        self.fields = FIELDS + (ANALYSIS_FIELDS if with_analysis else [])
+        needs_header = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, "a", newline="", encoding="utf-8")
+        if output_format == "csv" and needs_header:
+            self.file.write(self._csv_line(dict(zip(self.fields, self.fields))))
+            self.file.flush()
+
+    def write(self, records):
+        if self.output_format == "csv":
+            lines = [self._csv_line({field: _csv_value(record.get(field)) for field in self.fields}) for record in records]
+        else:
+            lines = [json.dumps(record) + "\n" for record in records]
+        self.file.write("".join(lines))
+        self.file.flush()
+
+    def _csv_line(self, row):
+        buffer = _LineBuffer()
+        csv.DictWriter(buffer, self.fields, lineterminator="\n").writerow(row)
+        return buffer.value
+
+    def close(self):
+        self.file.close()
+
+
+class _LineBuffer:
+    def __init__(self):
+        """Minimal file object collecting what csv writes"""
+        self.value = ""
+
+    def write(self, text):
+        self.value += text
+
+
+def _csv_value(value):
+    # Skill lists read naturally as "a; b"; nested analysis results are kept as JSON
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return "; ".join(value)
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score resumes against job descriptions without the web app")
+    parser.add_argument("resumes", nargs="+", help="resume files, directories or glob patterns")
+    parser.add_argument("--job", action="append", required=True, help="job description file (repeatable)")
+    parser.add_argument("-o", "--output", required=True, help="output file (.jsonl or .csv)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="output format (default: from the extension)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--chunk-size", type=int, default=20, help="resumes per worker task")
+    parser.add_argument("--analysis", action="store_true", help="include structure and formatting analysis")
+    parser.add_argument("--continue", dest="continue_run", action="store_true",
+                        help="skip (resume, job) pairs already in the output")
+    args = parser.parse_args(argv)
+
+    output_format = args.format or ("csv" if args.output.lower().endswith(".csv") else "jsonl")
+    jobs = load_jobs(args.job)
+    paths = find_resumes(args.resumes)
+
+    if args.continue_run:
+        done = read_done(args.output, output_format)
+    else:
+        done = set()
+        if os.path.exists(args.output):
+            os.remove(args.output)
+
+    tasks = [(path, [job_id for job_id in jobs if (path, job_id) not in done]) for path in paths]
+    tasks = [task for task in tasks if task[1]]
+    chunks = [tasks[start:start + args.chunk_size] for start in range(0, len(tasks), args.chunk_size)]
+    print(f"{len(paths)} resumes, {len(jobs)} jobs, {len(tasks)} resumes to score", file=sys.stderr)
+    if not tasks:
+        return 0
+
+    writer = ResultWriter(args.output, output_format, args.analysis)
+    started = time.perf_counter()
+    scored = 0
+    try:
+        # Executor workers are not daemonic, so they can start their own extraction process
+        with ProcessPoolExecutor(args.workers, initializer=_init_worker, initargs=(jobs, args.analysis)) as executor:
+            for future in as_completed([executor.submit(_score_chunk, chunk) for chunk in chunks]):
+                results = future.result()
+                for _, records in results:
+                    writer.write(records)
+                scored += len(results)
+                elapsed = time.perf_counter() - started
+                print(f"\r{scored}/{len(tasks)} resumes ({scored / elapsed:.1f}/s)", end="", file=sys.stderr)
+    finally:
+        writer.close()
+        print(file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+import numpy as np
+from scipy import sparse
+
+# Resume-only factors of the weighted score, in the column order of alignment matrices
+ALIGNMENT_FACTORS = ("domain", "experience", "education")
+
+# Default weights of the components of the weighted score (the TF-IDF 'semantic' one is off)
+DEFAULT_WEIGHTS = {"skills": 0.5, "domain": 0.2, "experience": 0.2, "education": 0.1, "semantic": 0.0}
+
+
+def score_weights(spec=None, semantic=0.0):
+    """Component weights from a 'skills=0.4,domain=0.2,...' spec, or the defaults making room for semantic"""
+    # A spec sets every weight (components left out are 0); without one, the default weights of
+    # the other components are scaled by 1 - semantic. Either way the weights must sum to 1,
+    # so a score stays within 0-100.
+    if spec:
+        weights = dict.fromkeys(DEFAULT_WEIGHTS, 0.0)
+        for item in spec.split(","):
+            name, _, value = item.partition("=")
+            name = name.strip()
+            if name not in weights:
+                raise ValueError(f"Unknown score weight '{name}'; use {', '.join(DEFAULT_WEIGHTS)}.")
+            weights[name] = float(value)
+    else:
+        if not 0 <= semantic <= 1:
+            raise ValueError("The semantic weight must be between 0 and 1.")
+        weights = {name: weight * (1 - semantic) for name, weight in DEFAULT_WEIGHTS.items()}
+        weights["semantic"] = semantic
+
+    if any(weight < 0 for weight in weights.values()):
+        raise ValueError("Score weights cannot be negative.")
+    if abs(sum(weights.values()) - 1) > 1e-9:
+        raise ValueError(f"Score weights must sum to 1, not {sum(weights.values()):g}.")
+    return weights
+
+
+class BatchScorer:
+    def __init__(self, weights, domain_keywords, experience_terms, education_terms):
+        """Score one job against many resumes with array operations instead of a loop of pairs"""
+        self.weights = weights
+        self.domain_keywords = frozenset(domain_keywords)
+        self.experience_terms = tuple(experience_terms)
+        self.education_terms = tuple(education_terms)
+
+    def alignment(self, lowered_texts, token_sets):
+        """N x 3 matrix of domain, experience and education factors (0 or 1) for lowercased resumes"""
+        count = len(lowered_texts)
+        matrix = np.zeros((count, len(ALIGNMENT_FACTORS)))
+        matrix[:, 0] = np.fromiter(
+            (not tokens.isdisjoint(self.domain_keywords) for tokens in token_sets), dtype=bool, count=count
+        )
+        matrix[:, 1] = np.fromiter(
+            (any(term in text for term in self.experience_terms) for text in lowered_texts), dtype=bool, count=count
+        )
+        matrix[:, 2] = np.fromiter(
+            (any(term in text for term in self.education_terms) for text in lowered_texts), dtype=bool, count=count
+        )
+        return matrix
+
+    def score(self, job_skills, resume_skills, alignment, semantic=None, required_years=None, tenure=None):
+        """Raw weighted scores (0 to 1) of resumes given their skill lists and alignment matrix"""
+        # Only the job's own skills can overlap, so they are the whole vocabulary of the batch
+        skill_ids = {skill: column for column, skill in enumerate(dict.fromkeys(job_skills))}
+        matrix = skill_matrix(resume_skills, skill_ids)
+        return self.score_matrix(job_skills, matrix, skill_ids, alignment, semantic=semantic,
+                                 required_years=required_years, tenure=tenure)
+
+    def score_matrix(self, job_skills, matrix, skill_ids, alignment, semantic=None, required_years=None,
+                     tenure=None):
+        """Raw weighted scores for resumes already encoded as a skill matrix over skill_ids"""
+        overlap = skill_overlap(job_skills, matrix, skill_ids)
+
+        # With the years a job asks for and each resume's tenure in years (NaN where unknown),
+        # the experience factor becomes numeric
+        experience = alignment[:, 1]
+        if required_years and tenure is not None:
+            experience = experience_factors(required_years, tenure, experience)
+
+        # Same terms, in the same order, as calculate_weighted_similarity so the floats match exactly
+        scores = (
+            self.weights['skills'] * overlap +
+            self.weights['domain'] * alignment[:, 0] +
+            self.weights['experience'] * experience +
+            self.weights['education'] * alignment[:, 2]
+        )
+        # Optional TF-IDF cosine component (an array of per-resume similarities to the job)
+        if semantic is not None:
+            scores = scores + self.weights.get('semantic', 0) * semantic
+        return scores
+
+
+def skill_matrix(skill_lists, skill_ids):
+    """Sparse 0/1 matrix with one row per resume and one column per skill in skill_ids"""
+    rows = []
+    columns = []
+    for row, skills in enumerate(skill_lists):
+        for column in {skill_ids[skill] for skill in skills if skill in skill_ids}:
+            rows.append(row)
+            columns.append(column)
+    return sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int64), (rows, columns)),
+        shape=(len(skill_lists), len(skill_ids))
+    )
+
+
+def skill_overlap(job_skills, matrix, skill_ids):
+    """Share of the job's skills found in each row: one sparse product for the whole batch"""
+    if not job_skills:
+        return np.zeros(matrix.shape[0])
+
+    job_vector = np.zeros(matrix.shape[1], dtype=np.int64)
+    for skill in job_skills:
+        if skill in skill_ids:
+            job_vector[skill_ids[skill]] = 1
+    return (matrix @ job_vector) / len(job_skills)
+
+
+def experience_factors(required_years, tenure, fallback):
+    """Share of the required years covered by each resume's tenure (capped at 1), else the fallback factor"""
+    return np.where(np.isnan(tenure), fallback, np.minimum(1.0, tenure / required_years))
+
+
+def as_percentages(scores):
+    """Round raw scores to the 0-100 scale with two decimals, exactly like the per-pair score"""
+    # Python's round per element; numpy's rounding can differ on halfway cases
+    return [round(float(score) * 100, 2) for score in scores]
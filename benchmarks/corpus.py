@@ -0,0 +1,151 @@
+import io
+import random
+
+import docx
+
+# Default skill vocabulary for synthetic documents (the runner passes the app's own list)
+DEFAULT_SKILLS = [
+    "python", "java", "javascript", "sql", "docker", "kubernetes", "aws", "react", "git",
+    "machine learning", "data analysis", "project management", "rest api", "linux"
+]
+
+FILLER_WORDS = [
+    "team", "product", "customer", "system", "service", "platform", "process", "quality",
+    "delivery", "feature", "release", "design", "support", "users", "performance", "reliability",
+    "stakeholders", "requirements", "roadmap", "infrastructure", "analysis", "reporting"
+]
+
+ACTION_VERBS = [
+    "developed", "led", "implemented", "designed", "improved", "built", "reduced", "automated",
+    "delivered", "managed", "optimized", "launched"
+]
+
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+def _sentence(rng, length, skills, skill_density):
+    words = []
+    for _ in range(length):
+        if rng.random() < skill_density:
+            words.append(rng.choice(skills))
+        else:
+            words.append(rng.choice(FILLER_WORDS))
+    return " ".join(words)
+
+
+def generate_resume(rng, words=400, skill_density=0.05, skills=DEFAULT_SKILLS):
+    """Plain-text resume with the usual sections, bullets, dates and numbers"""
+    lines = [
+        f"Candidate {rng.randint(1, 10 ** 6)}",
+        f"email: candidate{rng.randint(1, 999)}@example.com | phone: 555-{rng.randint(1000, 9999)}",
+        "",
+        "Summary",
+        f"Engineer with {rng.randint(1, 15)} years of experience in {_sentence(rng, 12, skills, skill_density)}.",
+        "",
+        "Experience",
+    ]
+
+    written = sum(len(line.split()) for line in lines)
+    year = 2024
+    while written < words:
+        start = year - rng.randint(1, 4)
+        lines.append(f"Software Engineer, Company {rng.randint(1, 500)} ({rng.choice(MONTHS)} {start} - {rng.choice(MONTHS)} {year})")
+        for _ in range(rng.randint(3, 6)):
+            bullet = (f"- {rng.choice(ACTION_VERBS).capitalize()} {_sentence(rng, rng.randint(8, 16), skills, skill_density)}"
+                      f" by {rng.randint(5, 60)}%")
+            lines.append(bullet)
+            written += len(bullet.split())
+        lines.append("")
+        year = start
+
+    lines += [
+        "Education",
+        f"B.S. Computer Science, University {rng.randint(1, 50)}, {year - 4}",
+        "",
+        "Skills",
+        ", ".join(rng.sample(skills, min(len(skills), max(1, int(len(skills) * skill_density * 4))))),
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def generate_job_description(rng, words=200, skill_density=0.1, skills=DEFAULT_SKILLS):
+    """Plain-text job description asking for a sample of the skills"""
+    required = rng.sample(skills, min(len(skills), max(1, int(len(skills) * skill_density * 4))))
+    lines = [
+        "Senior Software Engineer",
+        f"We are looking for an engineer with {rng.randint(2, 8)}+ years of experience.",
+        "Requirements:",
+    ]
+    lines += [f"- Experience with {skill}" for skill in required]
+    written = sum(len(line.split()) for line in lines)
+    while written < words:
+        sentence = _sentence(rng, 15, skills, skill_density)
+        lines.append(sentence.capitalize() + ".")
+        written += 15
+    return "\n".join(lines) + "\n"
+
+
+def to_txt(text):
+    return text.encode("utf-8")
+
+
+def to_docx(text):
+    document = docx.Document()
+    for line in text.split("\n"):
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def to_pdf(text, lines_per_page=50):
+    """Minimal PDF with a text layer (Helvetica, one text object per page), written by hand"""
+    lines = text.split("\n")
+    pages = [lines[start:start + lines_per_page] for start in range(0, len(lines), lines_per_page)] or [[]]
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page objects are numbered
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    page_ids = []
+    for page_lines in pages:
+        escaped = [line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in page_lines]
+        stream = "BT /F1 10 Tf 12 TL 50 790 Td " + " ".join(f"({line}) Tj T*" for line in escaped) + " ET"
+        stream = stream.encode("latin-1", errors="replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (len(objects))
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(page_ids)
+
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(output.tell())
+        output.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = output.tell()
+    output.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        output.write(b"%010d 00000 n \n" % offset)
+    output.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return output.getvalue()
+
+
+WRITERS = {"txt": to_txt, "docx": to_docx, "pdf": to_pdf}
+
+
+def generate_corpus(count, formats=("txt", "docx", "pdf"), words=400, skill_density=0.05,
+                    skills=DEFAULT_SKILLS, seed=0):
+    """Reproducible list of (filename, data, text) resumes, cycling through the formats"""
+    rng = random.Random(seed)
+    corpus = []
+    for index in range(count):
+        extension = formats[index % len(formats)]
+        text = generate_resume(rng, words=words, skill_density=skill_density, skills=skills)
+        corpus.append((f"resume_{index:04d}.{extension}", WRITERS[extension](text), text))
+    return corpus
@@ -0,0 +1,184 @@
+"""Benchmark the analysis pipeline on a synthetic resume corpus.
+
+    python benchmarks/run.py --sizes 1,10,100,1000 --output benchmarks/results.json
+    python benchmarks/run.py --baseline benchmarks/baseline.json
+
+Each stage is timed per document (per request for the matcher) and summarized as total
+time, throughput, p50 and p95 latency. With --baseline, stages whose p95 grew or whose
+throughput dropped by more than --tolerance are reported and the exit status is 1.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app  # noqa: E402
+import resume_pipeline  # noqa: E402
+from corpus import generate_corpus, generate_job_description  # noqa: E402
+from instrumentation import METRICS  # noqa: E402
+from keyword_extractor import KeywordExtractor  # noqa: E402
+from skill_taxonomy import get_taxonomy  # noqa: E402
+from text_extraction import extract_text_from_docx, extract_text_from_pdf, extract_text_from_txt  # noqa: E402
+
+EXTRACTORS = {"txt": extract_text_from_txt, "docx": extract_text_from_docx, "pdf": extract_text_from_pdf}
+
+
+def summarize(latencies, documents):
+    """Total, throughput and latency percentiles of one stage at one corpus size"""
+    ordered = sorted(latencies)
+    total = sum(ordered)
+
+    def percentile(fraction):
+        # Nearest-rank percentile
+        return ordered[max(0, int(round(fraction * len(ordered) + 0.5)) - 1)] * 1000 if ordered else 0.0
+
+    return {
+        "calls": len(ordered),
+        "documents": documents,
+        "total_seconds": total,
+        "throughput_per_second": documents / total if total else None,
+        "mean_ms": total / len(ordered) * 1000 if ordered else 0.0,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95)
+    }
+
+
+def time_each(func, items):
+    latencies = []
+    for item in items:
+        start = time.perf_counter()
+        func(item)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def bench_size(corpus, job_description, repeats):
+    """Time every stage on one corpus; returns {stage: summary}"""
+    texts = [text for _, _, text in corpus]
+    results = {}
+
+    for extension, extractor in EXTRACTORS.items():
+        documents = [data for filename, data, _ in corpus if filename.endswith("." + extension)]
+        if documents:
+            results[f"extract_text_{extension}"] = summarize(time_each(extractor, documents), len(documents))
+
+    results["extract_skills"] = summarize(time_each(resume_pipeline.extract_skills, texts), len(texts))
+
+    try:
+        extractor = KeywordExtractor()
+        extractor.nlp
+    except OSError as exc:
+        results["extract_keywords"] = {"skipped": f"spaCy model unavailable: {exc}"}
+    else:
+        results["extract_keywords"] = summarize(time_each(extractor.extract_keywords, texts), len(texts))
+
+    results["analyze_structure"] = summarize(
+        time_each(resume_pipeline.structure_analyzer.analyze_structure, texts), len(texts)
+    )
+    results["analyze_formatting"] = summarize(
+        time_each(resume_pipeline.formatting_analyzer.analyze_formatting, texts), len(texts)
+    )
+
+    # The whole matcher request, from a cold analysis cache each time
+    client = app.app.test_client()
+    latencies = []
+    for _ in range(repeats):
+        resume_pipeline.analysis_cache.clear()
+        data = {
+            "job_description": job_description,
+            "resumes": [(io.BytesIO(data), filename) for filename, data, _ in corpus]
+        }
+        start = time.perf_counter()
+        response = client.post("/matcher", data=data, content_type="multipart/form-data")
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            raise RuntimeError(f"/matcher returned {response.status_code}")
+    results["matcher"] = summarize(latencies, len(corpus) * repeats)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Regressions of results against a baseline run, as human-readable strings"""
+    regressions = []
+    for size, stages in results["sizes"].items():
+        for stage, current in stages.items():
+            previous = baseline.get("sizes", {}).get(size, {}).get(stage)
+            if not previous or "skipped" in current or "skipped" in previous:
+                continue
+            if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+                regressions.append(
+                    f"{stage} @ {size}: p95 {current['p95_ms']:.2f} ms (baseline {previous['p95_ms']:.2f} ms)"
+                )
+            if (current["throughput_per_second"] and previous["throughput_per_second"] and
+                    current["throughput_per_second"] < previous["throughput_per_second"] * (1 - tolerance)):
+                regressions.append(
+                    f"{stage} @ {size}: {current['throughput_per_second']:.1f} docs/s "
+                    f"(baseline {previous['throughput_per_second']:.1f} docs/s)"
+                )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark resume analysis on a synthetic corpus")
+    parser.add_argument("--sizes", default="1,10,100,1000", help="comma-separated corpus sizes")
+    parser.add_argument("--formats", default="txt,docx,pdf", help="comma-separated resume formats")
+    parser.add_argument("--words", type=int, default=400, help="approximate words per resume")
+    parser.add_argument("--skill-density", type=float, default=0.05, help="share of words that are skills")
+    parser.add_argument("--repeats", type=int, default=3, help="matcher requests per size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=os.path.join("benchmarks", "results.json"))
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown")
+    args = parser.parse_args(argv)
+
+    skills = sorted(get_taxonomy().skills(resume_pipeline.SCORING_CATEGORIES))
+    job_description = generate_job_description(random.Random(args.seed), skills=skills)
+    formats = tuple(args.formats.split(","))
+
+    # Stage totals from the app's own instrumentation are reported next to the timings
+    METRICS.enabled = True
+
+    results = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": vars(args),
+        "sizes": {},
+        "stages": {}
+    }
+    for size in (int(size) for size in args.sizes.split(",")):
+        corpus = generate_corpus(size, formats=formats, words=args.words, skill_density=args.skill_density,
+                                 skills=skills, seed=args.seed)
+        METRICS.reset()
+        results["sizes"][str(size)] = bench_size(corpus, job_description, args.repeats)
+        results["stages"][str(size)] = METRICS.snapshot()
+        matcher = results["sizes"][str(size)]["matcher"]
+        print(f"{size:>5} resumes: matcher p95 {matcher['p95_ms']:.1f} ms, "
+              f"{matcher['throughput_per_second']:.1f} resumes/s")
+
+    directory = os.path.dirname(args.output)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print("REGRESSION", regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+import json
+import threading
+import time
+
+import numpy as np
+from scipy import sparse
+
+from batch_scoring import ALIGNMENT_FACTORS, as_percentages
+from sqlite_store import connect, ensure_directory
+from tfidf_model import TERM_FEATURES, term_counts
+
+
+class CandidateIndex:
+    def __init__(self, db_path, vocabulary):
+        """Persistent index of parsed resumes for ranking a talent pool against new job descriptions"""
+        self.db_path = db_path
+        self.vocabulary = sorted(set(vocabulary))
+        self._skill_ids = {skill: index for index, skill in enumerate(self.vocabulary)}
+        self._lock = threading.Lock()
+
+        ensure_directory(db_path)
+
+        with connect(self.db_path) as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS candidates ("
+                "row INTEGER PRIMARY KEY AUTOINCREMENT, candidate_id TEXT NOT NULL UNIQUE, "
+                "text TEXT NOT NULL, skills TEXT NOT NULL, skill_bits BLOB NOT NULL, "
+                "alignment TEXT NOT NULL, terms BLOB NOT NULL, updated REAL NOT NULL, tenure REAL)"
+            )
+            # Indexes created before tenure was stored get the column, empty for existing rows
+            columns = [column[1] for column in db.execute("PRAGMA table_info(candidates)")]
+            if "tenure" not in columns:
+                db.execute("ALTER TABLE candidates ADD COLUMN tenure REAL")
+            db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            stored = db.execute("SELECT value FROM meta WHERE key = 'vocabulary'").fetchone()
+
+        # Bitsets are positional, so a changed vocabulary means they are re-packed from the stored
+        # skill lists (resumes are not re-scanned for skills the old vocabulary did not have)
+        if stored is None or json.loads(stored[0]) != self.vocabulary:
+            self._rebuild_bits()
+
+        # The matrices are reused while the store's generation (bumped by every write, from any
+        # process) is the one they were built at
+        self._matrices = None
+        self._generation = None
+
+    def __len__(self):
+        with connect(self.db_path) as db:
+            return db.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    def add(self, candidate_id, text, skills, alignment, tenure_years=None):
+        """Add or replace one candidate's text, skill set, alignment factors and tenure"""
+        self.add_many([(candidate_id, text, skills, alignment, tenure_years)])
+
+    def add_many(self, candidates):
+        """Add or replace (candidate_id, text, skills, alignment, tenure_years) entries in one transaction"""
+        candidates = list(candidates)
+        term_rows = term_counts([candidate[1] for candidate in candidates])
+        now = time.time()
+        rows = []
+        for (candidate_id, text, skills, alignment, tenure_years), terms in zip(candidates, term_rows):
+            skills = sorted(skill for skill in set(skills) if skill in self._skill_ids)
+            rows.append((
+                candidate_id, text, json.dumps(skills), self._pack_skills(skills),
+                json.dumps([alignment[factor] for factor in ALIGNMENT_FACTORS]),
+                _pack_terms(terms), now, tenure_years
+            ))
+
+        with self._lock, connect(self.db_path) as db:
+            db.executemany("DELETE FROM candidates WHERE candidate_id = ?", [(row[0],) for row in rows])
+            db.executemany(
+                "INSERT INTO candidates (candidate_id, text, skills, skill_bits, alignment, terms, updated, tenure) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            _bump_generation(db)
+        return len(rows)
+
+    def remove(self, candidate_id):
+        """Drop a candidate from the index"""
+        with self._lock, connect(self.db_path) as db:
+            db.execute("DELETE FROM candidates WHERE candidate_id = ?", (candidate_id,))
+            _bump_generation(db)
+
+    def get(self, candidate_id):
+        """Return a stored candidate as a dict, or None"""
+        with connect(self.db_path) as db:
+            row = db.execute(
+                "SELECT candidate_id, text, skills, alignment, tenure FROM candidates WHERE candidate_id = ?",
+                (candidate_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": row[0],
+            "text": row[1],
+            "skills": json.loads(row[2]),
+            "alignment": dict(zip(ALIGNMENT_FACTORS, json.loads(row[3]))),
+            "tenure_years": row[4]
+        }
+
+    def rank(self, job_skills, scorer, top_k=10, semantic=None, required_years=None):
+        """Score every candidate against a job's skills in one vectorized pass; return the top k"""
+        # semantic, if given, maps the term-count matrix to each candidate's similarity to the job
+        ids, skill_matrix, alignment, terms, tenure = self._load()
+        if not ids:
+            return []
+
+        scores = scorer.score_matrix(job_skills, skill_matrix, self._skill_ids, alignment,
+                                     semantic=None if semantic is None else semantic(terms),
+                                     required_years=required_years, tenure=tenure)
+        top = _top_k(scores, top_k)
+        return list(zip([ids[row] for row in top], as_percentages(scores[top])))
+
+    def term_vectors(self):
+        """Candidate IDs and their sparse hashed term-count matrix (one row per candidate)"""
+        ids, _, _, terms, _ = self._load()
+        return ids, terms
+
+    def _load(self):
+        """Build (or reuse) the in-memory matrices from the persistent store"""
+        with self._lock:
+            with connect(self.db_path) as db:
+                # Read before the rows: a write in between only makes the next call rebuild again
+                generation = _generation(db)
+                if self._matrices is not None and generation == self._generation:
+                    return self._matrices
+                rows = db.execute(
+                    "SELECT candidate_id, skill_bits, alignment, terms, tenure FROM candidates ORDER BY row"
+                ).fetchall()
+
+            ids = [row[0] for row in rows]
+            width = len(self.vocabulary)
+            if rows:
+                bits = np.frombuffer(b"".join(row[1] for row in rows), dtype=np.uint8).reshape(len(rows), -1)
+                dense = np.unpackbits(bits, axis=1, count=width)
+                skill_matrix = sparse.csr_matrix(dense, dtype=np.int64)
+                alignment = np.array([json.loads(row[2]) for row in rows], dtype=np.float64)
+                terms = _stack_terms([row[3] for row in rows])
+                # Candidates without dated positions (or indexed before tenure was stored) are NaN
+                tenure = np.array([np.nan if row[4] is None else row[4] for row in rows], dtype=np.float64)
+            else:
+                skill_matrix = sparse.csr_matrix((0, width), dtype=np.int64)
+                alignment = np.zeros((0, len(ALIGNMENT_FACTORS)))
+                terms = sparse.csr_matrix((0, TERM_FEATURES))
+                tenure = np.zeros(0)
+
+            self._matrices = (ids, skill_matrix, alignment, terms, tenure)
+            self._generation = generation
+            return self._matrices
+
+    def _pack_skills(self, skills):
+        bits = np.zeros(len(self.vocabulary), dtype=np.uint8)
+        for skill in skills:
+            bits[self._skill_ids[skill]] = 1
+        return np.packbits(bits).tobytes()
+
+    def _rebuild_bits(self):
+        with self._lock, connect(self.db_path) as db:
+            rows = db.execute("SELECT row, skills FROM candidates").fetchall()
+            db.executemany(
+                "UPDATE candidates SET skill_bits = ? WHERE row = ?",
+                [
+                    (self._pack_skills([skill for skill in json.loads(skills) if skill in self._skill_ids]), row)
+                    for row, skills in rows
+                ]
+            )
+            db.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('vocabulary', ?)",
+                (json.dumps(self.vocabulary),)
+            )
+            _bump_generation(db)
+
+
+def _generation(db):
+    row = db.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+    return int(row[0]) if row else 0
+
+
+def _bump_generation(db):
+    """Count a write to the candidates, within its transaction"""
+    db.execute(
+        "INSERT INTO meta (key, value) VALUES ('generation', '1') "
+        "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+    )
+
+
+def _pack_terms(row):
+    """Serialize one sparse term-count row as its column indices followed by its counts"""
+    row = row.tocsr()
+    return row.indices.astype(np.int32).tobytes() + row.data.astype(np.float32).tobytes()
+
+
+def _stack_terms(blobs):
+    """Assemble serialized term rows into one CSR matrix without per-row sparse objects"""
+    sizes = np.array([len(blob) // 8 for blob in blobs], dtype=np.int64)
+    indptr = np.concatenate(([0], np.cumsum(sizes)))
+    indices = np.empty(indptr[-1], dtype=np.int32)
+    data = np.empty(indptr[-1], dtype=np.float32)
+    for blob, size, start in zip(blobs, sizes, indptr):
+        indices[start:start + size] = np.frombuffer(blob, dtype=np.int32, count=size)
+        data[start:start + size] = np.frombuffer(blob, dtype=np.float32, offset=size * 4, count=size)
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(blobs), TERM_FEATURES))
+
+
+def _top_k(scores, k):
+    """Row numbers of the k highest scores, best first; ties keep index order"""
+    if k is None or k >= len(scores):
+        candidates = np.arange(len(scores))
+    else:
+        # Include every row tied with the k-th score so the stable tie-break stays exact
+        threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+        candidates = np.flatnonzero(scores >= threshold)
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order][:k]
@@ -0,0 +1,136 @@
+import datetime
+import re
+
+from skill_taxonomy import get_taxonomy
+
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10
+}
+
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12
+}
+
+_NUMBER = r"\d{1,2}|" + "|".join(NUMBER_WORDS)
+
+# One pass over a job description finds both kinds of requirement: "3-5 years of experience
+# in X" (with years) and phrases such as "proficient in X" (without). The subject runs to the
+# end of the clause and is where the required skills are looked up.
+REQUIREMENT_PATTERN = re.compile(r"""
+    \b(?:
+        (?:(?:at\ least|a\ minimum\ of|minimum(?:\ of)?|min\.?|over|more\ than)\s+)?
+        (?P<min>""" + _NUMBER + r""")
+        (?:\s*\+|\s*(?:to|-|–)\s*(?P<max>""" + _NUMBER + r"""))?
+        \s*\+?\s*(?:years?|yrs?)\b['’]?\.?
+        (?:\s+of)?(?:\s+(?:professional|relevant|industry|hands-on|working|work|commercial|related)){0,2}
+        \s+experience\b(?:\s+(?:in|with|using|of)\b)?
+      |
+        (?:experienced|expertise|proficient|proficiency|skilled|background)\s+(?:in|with)\b
+      | knowledge\s+of\b
+      | familiarity\s+with\b
+    )
+    [ \t]*(?P<subject>[^,.;:\n]{0,80})
+""", re.IGNORECASE | re.VERBOSE)
+
+_DATE = r"""
+    (?:(?P<{0}_month>jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+
+      |(?P<{0}_number>0?[1-9]|1[0-2])\s*/\s*)?
+    (?P<{0}_year>(?:19|20)\d{{2}})\b
+"""
+
+# A date range of a position: "Jan 2020 - Mar 2023", "03/2019 to present", "2016 – 2018"
+DATE_RANGE_PATTERN = re.compile(
+    r"\b" + _DATE.format("start") +
+    r"\s*(?:-|–|—|to|until|through)\s*(?:" + _DATE.format("end") +
+    r"|(?P<current>present|current|now|today|date)\b)",
+    re.IGNORECASE | re.VERBOSE
+)
+
+# Ranges longer than this are treated as misread dates rather than one position
+MAX_RANGE_MONTHS = 50 * 12
+
+# Sections whose date ranges are positions; education and other dated sections are not tenure
+TENURE_SECTIONS = {"experience"}
+
+
+class ExperienceParser:
+    def __init__(self, skill_categories=None):
+        """Extract structured experience requirements from job descriptions and tenure from resumes"""
+        # Taxonomy categories of the skills attached to a requirement (None means every skill)
+        self.skill_categories = skill_categories
+
+    def requirements(self, text):
+        """Requirements as dicts of min_years, max_years (None if not stated), skills and the matched text"""
+        taxonomy = get_taxonomy()
+        requirements = []
+        for match in REQUIREMENT_PATTERN.finditer(text):
+            min_years = _years(match.group("min"))
+            max_years = _years(match.group("max"))
+            if min_years is not None and max_years is not None and max_years < min_years:
+                min_years, max_years = max_years, min_years
+            requirements.append({
+                "min_years": min_years,
+                "max_years": max_years,
+                "skills": sorted(taxonomy.find(match.group("subject"), self.skill_categories)),
+                "text": " ".join(match.group(0).split())
+            })
+        return requirements
+
+    def required_years(self, requirements):
+        """The years of experience a job asks for: the largest minimum among its requirements"""
+        years = [requirement["min_years"] for requirement in requirements if requirement["min_years"] is not None]
+        return max(years) if years else None
+
+    def tenure(self, text, sections=None, today=None):
+        """Total months covered by the date ranges of a resume, overlapping positions counted once"""
+        # Open ranges ("- present") end at today, so a cached tenure reflects the date it was parsed.
+        # With section spans (offset, length, section_type) that include an experience section,
+        # only those sections are read; without one the whole text is.
+        today = today or datetime.date.today()
+        current = today.year * 12 + today.month
+
+        spans = [
+            (offset, offset + length) for offset, length, section_type in sections or ()
+            if section_type in TENURE_SECTIONS
+        ] or [(0, len(text))]
+
+        intervals = []
+        for span_start, span_end in spans:
+            for match in DATE_RANGE_PATTERN.finditer(text, span_start, span_end):
+                start = _month_index(match, "start", end=False)
+                end = current if match.group("current") else _month_index(match, "end", end=True)
+                if start < end <= current and end - start <= MAX_RANGE_MONTHS:
+                    intervals.append((start, end))
+
+        months = 0
+        covered_until = None
+        for start, end in sorted(intervals):
+            if covered_until is not None and start < covered_until:
+                start = covered_until
+            if end > start:
+                months += end - start
+                covered_until = end
+        return {"months": months, "ranges": len(intervals)}
+
+
+def _years(value):
+    if value is None:
+        return None
+    value = value.lower()
+    return NUMBER_WORDS[value] if value in NUMBER_WORDS else int(value)
+
+
+def _month_index(match, prefix, end):
+    """Months since year 0 at the start of a range, or just past its end (end months are inclusive)"""
+    year = int(match.group(prefix + "_year"))
+    month = match.group(prefix + "_month")
+    number = match.group(prefix + "_number")
+    if month:
+        month = MONTHS[month.lower()]
+    elif number:
+        month = int(number)
+    else:
+        # A bare year: "2016 - 2018" counts as two years
+        return year * 12
+    return year * 12 + month - 1 + (1 if end else 0)
@@ -1,9 +1,178 @@
 import re
 
+from instrumentation import stage
+
+# Section headers whose spacing and capitalization are checked
+SECTION_HEADERS = ["experience", "education", "skills", "summary", "profile", "projects"]
+
+STANDARD_SECTIONS = {
+    "summary", "profile", "objective", "experience", "work experience", "employment history",
+    "education", "skills", "technical skills", "certifications", "projects", "publications",
+    "awards", "honors", "activities", "interests", "languages", "references"
+}
+
+# Markdown or unusual formatting characters that might indicate font changes
+FORMATTING_CHARS = ["*", "_", "#", "==", "--", "++", "~~"]
+
+# Common bullet characters
+BULLET_CHARS = ["•", "-", "*", "–", "—", ">"]
+
+# A line starting with a section header; one group per header (none is a prefix of another)
+HEADER_START = re.compile("|".join(f"({header})" for header in SECTION_HEADERS), re.IGNORECASE)
+
+# Every position of a line where a section header starts (overlapping ones included)
+HEADER_ANYWHERE = re.compile("(?=" + "|".join(SECTION_HEADERS) + ")", re.IGNORECASE)
+
+# Characters a potential section name is made of. \s also matches newlines, so a name can run
+# over several lines made only of these characters.
+SECTION_CHARS = re.compile(r'[A-Za-z\s]*')
+
+# Multi-character formatting marks (the single characters are looked up in the character set)
+FORMATTING_MARKS = re.compile("|".join(re.escape(char) for char in FORMATTING_CHARS if len(char) > 1))
+
+# Common date patterns
+DATE_PATTERNS = [re.compile(pattern) for pattern in [
+    r'\b\d{1,2}/\d{1,2}/\d{2,4}\b',              # MM/DD/YYYY or DD/MM/YYYY
+    r'\b\d{1,2}-\d{1,2}-\d{2,4}\b',              # MM-DD-YYYY or DD-MM-YYYY
+    r'\b[A-Z][a-z]{2,8}\s+\d{4}\b',              # Month YYYY
+    r'\b\d{4}\s+to\s+\d{4}\b',                   # YYYY to YYYY
+    r'\b\d{4}\s*-\s*\d{4}\b',                    # YYYY-YYYY
+    r'\b\d{4}\s*–\s*(?:\d{4}|present)\b',        # YYYY–YYYY or YYYY–present
+    r'\b[A-Z][a-z]{2,8}\s+\d{4}\s*-\s*[A-Z][a-z]{2,8}\s+\d{4}\b',  # Month YYYY - Month YYYY
+    r'\b[A-Z][a-z]{2,8}\s+\d{4}\s*-\s*present\b'  # Month YYYY - present
+]]
+ANY_DATE = re.compile("|".join(pattern.pattern for pattern in DATE_PATTERNS))
+
+# Dates are matched line by line with whitespace runs collapsed to one space, which the patterns
+# cannot tell apart from the original. A date split over lines starts in the last DATE_CONTEXT
+# characters before the break (the longest date is 31 characters), plus one for its \b.
+DATE_CONTEXT = 32
+
+
+class FormattingFacts:
+    def __init__(self, text):
+        """Facts shared by the formatting rules, gathered in one pass over the lines of a resume"""
+        self.characters = set()
+        self.formatting_marks = False
+        # Two blank lines in a row (three newlines)
+        self.blank_line_run = False
+        # Whether the line after each distinct header line has text, per header, for the spacing check
+        self.header_followers = {header: [] for header in SECTION_HEADERS}
+        # Case style of each header line seen by the capitalization check
+        self.header_cases = []
+        # Potential section names: capitalized runs of letters and whitespace ending a line,
+        # optionally with a colon (a name may run over several such lines)
+        self.section_names = []
+        # Indexes of the DATE_PATTERNS found (the rule only needs to know about two)
+        self.date_patterns = set()
+
+        lines = text.split('\n')
+        last_index = len(lines) - 1
+        # Distinct header lines (with their newline) per header, and where the lines that end
+        # with a header start: (line index, offset) by the length of that ending
+        header_lines = {header: {} for header in SECTION_HEADERS}
+        header_endings = {}
+        previous_case_line = {}
+        section_start = True
+        section_lines = None
+        date_tail = ""
+
+        for index, line in enumerate(lines):
+            self.characters.update(line)
+            if not self.formatting_marks and FORMATTING_MARKS.search(line):
+                self.formatting_marks = True
+            if not line and 2 <= index < last_index and not lines[index - 1]:
+                self.blank_line_run = True
+
+            if index < last_index:
+                for match in HEADER_ANYWHERE.finditer(line):
+                    header_endings.setdefault(len(line) - match.start(), []).append((index, match.start()))
+
+            # Potential sections: a name starts a line that follows a newline no earlier name
+            # took, and runs over whole lines of SECTION_CHARS up to the line that ends it
+            whole = SECTION_CHARS.fullmatch(line) is not None
+            if section_lines is not None:
+                if whole:
+                    section_lines.append(line)
+                else:
+                    section_start = self._end_section(section_lines, line)
+                    section_lines = None
+            elif section_start and 'A' <= line[:1] <= 'Z':
+                if whole:
+                    section_lines = [line]
+                else:
+                    section_start = self._end_section([], line)
+            else:
+                section_start = True
+
+            if len(self.date_patterns) < 2:
+                normalized = " ".join(line.split())
+                if normalized:
+                    segment = (date_tail or " ") + " " + normalized
+                    if ANY_DATE.search(segment, 1):
+                        self.date_patterns.update(
+                            number for number, pattern in enumerate(DATE_PATTERNS) if pattern.search(segment, 1)
+                        )
+                    date_tail = segment[-(DATE_CONTEXT + 1):]
+
+            match = HEADER_START.match(line)
+            if match is None:
+                continue
+            header = SECTION_HEADERS[match.lastindex - 1]
+
+            # Only header lines that end with a newline count for spacing
+            if index < last_index:
+                header_lines[header][line + '\n'] = None
+
+            # A header line right after one counted for the same header is skipped: the
+            # capitalization pattern consumed the newline that would start it
+            if previous_case_line.get(header) == index - 1:
+                continue
+            previous_case_line[header] = index
+            if line.isupper():
+                self.header_cases.append("upper")
+            elif line.istitle():
+                self.header_cases.append("title")
+            else:
+                self.header_cases.append("other")
+
+        # A name still open at the end runs to the end of the text
+        if section_lines is not None and len("\n".join(section_lines)) >= 2:
+            self.section_names.append("\n".join(section_lines))
+
+        # The line checked after a header line is the one after the first place its text appears,
+        # which may end a longer line: the first line ending with it
+        lengths = {len(header_line) - 1 for lines_of_header in header_lines.values() for header_line in lines_of_header}
+        first_ending = {}
+        for length in lengths:
+            for index, offset in header_endings.get(length, ()):
+                first_ending.setdefault(lines[index][offset:], index)
+        for header, lines_of_header in header_lines.items():
+            self.header_followers[header] = [
+                bool(lines[first_ending[header_line[:-1]] + 1].strip()) for header_line in lines_of_header
+            ]
+
+    def _end_section(self, name_lines, line):
+        """Close a potential section at the first line not wholly made of SECTION_CHARS"""
+        # Returns whether the line after this one may start a name. A name ending in a colon at
+        # the end of this line takes this line and its newline; otherwise it ends with the
+        # lines before this one, and a name too short for the pattern is no match.
+        end = SECTION_CHARS.match(line).end()
+        if line[end] == ':' and end == len(line) - 1:
+            name = "\n".join(name_lines + [line[:end]])
+            if len(name) >= 2:
+                self.section_names.append(name)
+                return False
+        name = "\n".join(name_lines)
+        if len(name) >= 2:
+            self.section_names.append(name)
+        return True
+
+
 class FormattingAnalyzer:
     def __init__(self):
         """Initialize the formatting analyzer"""
-        # Common resume formatting issues
+        # Common resume formatting issues; each rule reads the shared facts of the resume
         self.formatting_checks = {
             "inconsistent_spacing": self._check_inconsistent_spacing,
             "irregular_capitalization": self._check_irregular_capitalization,
@@ -12,136 +181,73 @@ class FormattingAnalyzer:
             "bullets_formatting": self._check_bullets_formatting,
             "date_consistency": self._check_date_consistency
         }
-    
+
+    @stage("analyze_formatting")
     def analyze_formatting(self, text):
         """Analyze the formatting of a resume and provide suggestions"""
         suggestions = []
-        
+        facts = FormattingFacts(text)
+
         for check_name, check_function in self.formatting_checks.items():
-            result = check_function(text)
+            result = check_function(facts)
             if result:
                 suggestions.append(result)
-        
+
         return suggestions
-    
-    def _check_inconsistent_spacing(self, text):
+
+    def _check_inconsistent_spacing(self, facts):
         """Check for inconsistent spacing in the resume"""
         # Check for multiple consecutive blank lines
-        if re.search(r'\n{3,}', text):
+        if facts.blank_line_run:
             return "Be consistent with spacing between sections. Avoid having multiple blank lines."
-        
+
         # Check for inconsistent line breaks after section headers
-        section_headers = ["experience", "education", "skills", "summary", "profile", "projects"]
-        inconsistent_spacing = False
-        
-        for header in section_headers:
-            pattern = f'(?i)^{header}.*?\n'
-            matches = re.findall(pattern, text, re.MULTILINE)
-            
-            if matches:
-                # Check the lines following each match
-                following_lines = [text[text.find(match) + len(match):].split('\n', 1)[0] for match in matches]
-                if any(line.strip() for line in following_lines) and any(not line.strip() for line in following_lines):
-                    inconsistent_spacing = True
-                    break
-        
-        if inconsistent_spacing:
-            return "Maintain consistent spacing after section headers throughout your resume."
-        
+        for followers in facts.header_followers.values():
+            if any(followers) and not all(followers):
+                return "Maintain consistent spacing after section headers throughout your resume."
+
         return None
-    
-    def _check_irregular_capitalization(self, text):
+
+    def _check_irregular_capitalization(self, facts):
         """Check for inconsistent capitalization"""
-        # Check for inconsistent capitalization in section headers
-        section_headers = ["experience", "education", "skills", "summary", "profile", "projects"]
-        capitals = []
-        
-        for header in section_headers:
-            pattern = f'(?:^|\n)({header}.*?)(?:\n|$)'
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            
-            for match in matches:
-                # Check if all caps or title case
-                if match.isupper():
-                    capitals.append("upper")
-                elif match.istitle():
-                    capitals.append("title")
-                else:
-                    capitals.append("other")
-        
-        if len(set(capitals)) > 1 and len(capitals) > 1:
+        if len(set(facts.header_cases)) > 1 and len(facts.header_cases) > 1:
             return "Be consistent with capitalization in section headers. Stick to either ALL CAPS or Title Case."
-        
+
         return None
-    
-    def _check_font_consistency(self, text):
+
+    def _check_font_consistency(self, facts):
         """Check for font consistency clues"""
         # This is a heuristic since we can't directly detect fonts from plain text
-        # Look for markdown or unusual formatting characters that might indicate font changes
-        formatting_chars = ["*", "_", "#", "==", "--", "++", "~~"]
-        
-        if any(char in text for char in formatting_chars):
+        if facts.formatting_marks or any(char in facts.characters for char in FORMATTING_CHARS if len(char) == 1):
             return "Ensure consistent font usage throughout your resume. Use at most 2 font families."
-        
+
         return None
-    
-    def _check_non_standard_sections(self, text):
+
+    def _check_non_standard_sections(self, facts):
         """Check for non-standard section names"""
-        standard_sections = {
-            "summary", "profile", "objective", "experience", "work experience", "employment history", 
-            "education", "skills", "technical skills", "certifications", "projects", "publications", 
-            "awards", "honors", "activities", "interests", "languages", "references"
-        }
-        
-        # Try to identify section headers
-        potential_sections = re.findall(r'(?:^|\n)([A-Z][A-Za-z\s]+):?(?:\n|$)', text)
-        
-        non_standard = [section.lower().strip() for section in potential_sections 
-                        if section.lower().strip() not in standard_sections 
-                        and len(section.strip()) > 3]
-        
-        if non_standard:
-            return "Consider using standard section headers that ATS systems can easily recognize."
-        
+        for section in facts.section_names:
+            if section.lower().strip() not in STANDARD_SECTIONS and len(section.strip()) > 3:
+                return "Consider using standard section headers that ATS systems can easily recognize."
+
         return None
-    
-    def _check_bullets_formatting(self, text):
+
+    def _check_bullets_formatting(self, facts):
         """Check for consistent bullet formatting"""
-        # Common bullet characters
-        bullet_chars = ["•", "-", "*", "–", "—", ">"]
-        used_bullets = [char for char in bullet_chars if char in text]
-        
+        used_bullets = [char for char in BULLET_CHARS if char in facts.characters]
+
         if len(used_bullets) > 1:
             return "Use consistent bullet point styles throughout your resume. Stick to one bullet character."
-        
+
         return None
-    
-    def _check_date_consistency(self, text):
+
+    def _check_date_consistency(self, facts):
         """Check for consistent date formatting"""
-        # Common date patterns
-        date_patterns = [
-            r'\b\d{1,2}/\d{1,2}/\d{2,4}\b',              # MM/DD/YYYY or DD/MM/YYYY
-            r'\b\d{1,2}-\d{1,2}-\d{2,4}\b',              # MM-DD-YYYY or DD-MM-YYYY
-            r'\b[A-Z][a-z]{2,8}\s+\d{4}\b',              # Month YYYY
-            r'\b\d{4}\s+to\s+\d{4}\b',                   # YYYY to YYYY
-            r'\b\d{4}\s*-\s*\d{4}\b',                    # YYYY-YYYY
-            r'\b\d{4}\s*–\s*(?:\d{4}|present)\b',        # YYYY–YYYY or YYYY–present
-            r'\b[A-Z][a-z]{2,8}\s+\d{4}\s*-\s*[A-Z][a-z]{2,8}\s+\d{4}\b',  # Month YYYY - Month YYYY
-            r'\b[A-Z][a-z]{2,8}\s+\d{4}\s*-\s*present\b'  # Month YYYY - present
-        ]
-        
-        found_patterns = []
-        for pattern in date_patterns:
-            matches = re.findall(pattern, text)
-            if matches:
-                found_patterns.append(pattern)
-        
-        if len(found_patterns) > 1:
+        if len(facts.date_patterns) > 1:
             return "Use a consistent date format throughout your resume. For example, use either 'MM/YYYY' or 'Month YYYY' format everywhere."
-        
+
         return None
-    
+
     def get_top_formatting_suggestions(self, text, max_suggestions=3):
         """Get the top formatting suggestions for the resume"""
         suggestions = self.analyze_formatting(text)
-        return suggestions[:max_suggestions]
\ No newline at end of file
+        return suggestions[:max_suggestions]
@@ -0,0 +1,115 @@
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StageMetrics:
+    def __init__(self, enabled=False):
+        """Per-stage wall time, CPU time, call counts and document sizes for the analysis pipeline"""
+        # Disabled, a stage costs one attribute check per call
+        self.enabled = enabled
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._request = threading.local()
+
+    def stage(self, name, size=None):
+        """Decorator that records every call of a function as the named stage"""
+        # size(args) gives the document size of a call; by default the first text or bytes argument
+        size = size or _document_size
+
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.timed(name, size(args)):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @contextmanager
+    def timed(self, name, size=0):
+        """Record the enclosed block as one call of the named stage"""
+        if not self.enabled:
+            yield
+            return
+
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - wall_start, time.thread_time() - cpu_start, size)
+
+    def record(self, name, wall, cpu, size=0):
+        """Add one call of a stage to the totals (and to the current request's timings)"""
+        with self._lock:
+            stats = self._stats.setdefault(name, [0, 0.0, 0.0, 0])
+            stats[0] += 1
+            stats[1] += wall
+            stats[2] += cpu
+            stats[3] += size
+
+        timings = getattr(self._request, "timings", None)
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + wall
+
+    def begin_request(self):
+        """Start collecting stage timings for the request handled by this thread"""
+        self._request.timings = {} if self.enabled else None
+
+    def end_request(self):
+        """Stop collecting and return {stage: wall seconds} for the request, or None"""
+        timings = getattr(self._request, "timings", None)
+        self._request.timings = None
+        return timings
+
+    def snapshot(self):
+        """Totals per stage as {stage: {'calls', 'wall_seconds', 'cpu_seconds', 'document_chars'}}"""
+        with self._lock:
+            return {
+                name: {'calls': calls, 'wall_seconds': wall, 'cpu_seconds': cpu, 'document_chars': size}
+                for name, (calls, wall, cpu, size) in self._stats.items()
+            }
+
+    def reset(self):
+        """Drop every recorded total"""
+        with self._lock:
+            self._stats.clear()
+
+    def prometheus(self, prefix="resume_analyzer"):
+        """Totals in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        series = [
+            ("stage_calls_total", "calls", "Number of calls of each pipeline stage"),
+            ("stage_wall_seconds_total", "wall_seconds", "Wall-clock time spent in each pipeline stage"),
+            ("stage_cpu_seconds_total", "cpu_seconds", "CPU time of the calling thread spent in each pipeline stage"),
+            ("stage_document_chars_total", "document_chars", "Characters (or bytes) of documents passed to each stage")
+        ]
+        lines = []
+        for metric, field, description in series:
+            lines.append(f"# HELP {prefix}_{metric} {description}")
+            lines.append(f"# TYPE {prefix}_{metric} counter")
+            for name in sorted(snapshot):
+                lines.append(f'{prefix}_{metric}{{stage="{name}"}} {snapshot[name][field]}')
+        return "\n".join(lines) + "\n"
+
+
+def server_timing(timings):
+    """Server-Timing header value for {stage: wall seconds}"""
+    return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.items())
+
+
+def _document_size(args):
+    """Length of the first text or bytes argument of a stage call (0 if there is none)"""
+    for arg in args:
+        if isinstance(arg, (str, bytes)):
+            return len(arg)
+    return 0
+
+
+# Process-wide metrics shared by the analysis modules; the app decides whether they are enabled
+METRICS = StageMetrics()
+stage = METRICS.stage
+timed = METRICS.timed
@@ -0,0 +1,85 @@
+import hashlib
+import json
+import time
+import uuid
+
+from sqlite_store import connect, ensure_directory
+
+
+def content_hash(text):
+    """SHA-256 of a job description; a profile's stored analysis is valid for this hash only"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class JobProfileStore:
+    def __init__(self, db_path):
+        """Persistent SQLite store of job descriptions with their precomputed analysis"""
+        self.db_path = db_path
+        ensure_directory(db_path)
+
+        with connect(self.db_path) as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS profiles ("
+                "id TEXT PRIMARY KEY, content_hash TEXT NOT NULL, version TEXT NOT NULL, "
+                "text TEXT NOT NULL, analysis TEXT NOT NULL, created REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS profiles_content_hash ON profiles (content_hash)")
+
+    def create(self, text, analysis, version):
+        """Store a job description with its analysis (a ParsedDocument dict) and return the new profile ID"""
+        profile_id = uuid.uuid4().hex
+        now = time.time()
+        with connect(self.db_path) as db:
+            db.execute(
+                "INSERT INTO profiles (id, content_hash, version, text, analysis, created, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (profile_id, content_hash(text), version, text, _dump_analysis(analysis), now, now)
+            )
+        return profile_id
+
+    def update(self, profile_id, text, analysis, version):
+        """Replace the text and analysis of a profile; False if there is no such profile"""
+        with connect(self.db_path) as db:
+            cursor = db.execute(
+                "UPDATE profiles SET content_hash = ?, version = ?, text = ?, analysis = ?, updated = ? WHERE id = ?",
+                (content_hash(text), version, text, _dump_analysis(analysis), time.time(), profile_id)
+            )
+            return cursor.rowcount == 1
+
+    def find(self, digest):
+        """ID of the oldest profile of a job description with this content hash, or None"""
+        with connect(self.db_path) as db:
+            row = db.execute(
+                "SELECT id FROM profiles WHERE content_hash = ? ORDER BY created LIMIT 1", (digest,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get(self, profile_id):
+        """Return a profile as a dict (its analysis including the text), or None"""
+        with connect(self.db_path) as db:
+            row = db.execute(
+                "SELECT id, content_hash, version, text, analysis, created, updated FROM profiles WHERE id = ?",
+                (profile_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        profile_id, digest, version, text, analysis, created, updated = row
+        return {
+            "id": profile_id,
+            "content_hash": digest,
+            "version": version,
+            "analysis": dict(json.loads(analysis), text=text),
+            "created": created,
+            "updated": updated
+        }
+
+    def delete(self, profile_id):
+        """Remove a profile; False if there was no such profile"""
+        with connect(self.db_path) as db:
+            return db.execute("DELETE FROM profiles WHERE id = ?", (profile_id,)).rowcount == 1
+
+
+def _dump_analysis(analysis):
+    # The text has its own column
+    return json.dumps({name: value for name, value in analysis.items() if name != "text"})
@@ -1,90 +1,63 @@
-import spacy
-import re
 from collections import Counter
 from itertools import combinations
 import string
+from skill_taxonomy import get_taxonomy
+from nlp_models import get_nlp
+from experience_parser import ExperienceParser
 
 class KeywordExtractor:
+    # Keyword extraction reads part-of-speech tags and noun chunks only
+    KEYWORD_DISABLED_PIPES = ["lemmatizer"]
+    
+    # Taxonomy categories reported by extract_skills (see skill_taxonomy.json)
+    SKILL_CATEGORIES = ["technical", "soft"]
+    
     def __init__(self, nlp_model="en_core_web_sm"):
         """Initialize the keyword extractor with a spaCy language model"""
-        self.nlp = spacy.load(nlp_model)
-        
-        # Load skill data
-        self.technical_skills = self._load_technical_skills()
-        self.soft_skills = self._load_soft_skills()
-        self.all_skills = self.technical_skills.union(self.soft_skills)
-        
-        # Common phrases that indicate experience
-        self.experience_phrases = [
-            "years of experience", "year experience", "years experience",
-            "experienced in", "expertise in", "proficient in", "skilled in",
-            "background in", "knowledge of", "familiarity with"
-        ]
-        
-    def _load_technical_skills(self):
-        """Load technical skills from a predefined list"""
-        # This is a simplified list; in a real application, this could be loaded from a database or file
-        skills = {
-            # Programming languages
-            "python", "java", "javascript", "typescript", "c++", "c#", "ruby", "php", "golang", "swift",
-            "kotlin", "rust", "scala", "perl", "r", "matlab", "sql", "nosql", "bash", "powershell",
-            
-            # Web development
-            "html", "css", "react", "angular", "vue", "jquery", "sass", "less", "bootstrap", "tailwind",
-            "node.js", "express", "django", "flask", "spring", "laravel", "asp.net", "rails",
-            
-            # Data science & AI
-            "machine learning", "deep learning", "data science", "artificial intelligence", "neural networks",
-            "nlp", "computer vision", "data mining", "big data", "statistics", "data analysis",
-            "tensorflow", "pytorch", "keras", "scikit-learn", "pandas", "numpy", "tableau", "power bi",
-            
-            # DevOps & Infrastructure
-            "aws", "azure", "gcp", "cloud computing", "docker", "kubernetes", "terraform", "jenkins",
-            "ci/cd", "devops", "git", "github", "gitlab", "jira", "agile", "scrum", "linux", "unix",
-            
-            # Database
-            "sql", "mysql", "postgresql", "mongodb", "oracle", "sql server", "redis", "elasticsearch",
-            "dynamodb", "cassandra", "neo4j", "graphql", "database design", "data modeling",
-            
-            # Mobile
-            "android", "ios", "react native", "flutter", "xamarin", "swift", "objective-c", "mobile development",
-            
-            # Other technical
-            "rest api", "graphql", "microservices", "serverless", "system architecture", "cybersecurity",
-            "blockchain", "networking", "testing", "qa", "seo", "ui/ux", "responsive design"
-        }
-        return set(skills)
-        
-    def _load_soft_skills(self):
-        """Load soft skills from a predefined list"""
-        skills = {
-            # Leadership & Management
-            "leadership", "management", "team lead", "project management", "strategic planning",
-            "decision making", "mentoring", "coaching", "team building", "conflict resolution",
-            
-            # Communication
-            "communication", "presentation", "public speaking", "technical writing", "documentation",
-            "interpersonal skills", "negotiation", "client relations", "customer service",
-            
-            # Collaboration
-            "teamwork", "collaboration", "cross-functional", "remote work", "distributed teams",
-            
-            # Problem solving
-            "problem solving", "critical thinking", "analytical skills", "research", "innovation",
-            "creativity", "troubleshooting", "debugging",
-            
-            # Work habits
-            "time management", "organization", "multitasking", "attention to detail", "adaptability",
-            "flexibility", "self-motivated", "independent", "initiative", "fast learner"
-        }
-        return set(skills)
-    
+        # The model itself is shared process-wide and loaded on first use
+        self.nlp_model = nlp_model
+        
+        # Experience requirements are parsed with the skills this extractor reports
+        self.experience_parser = ExperienceParser(self.SKILL_CATEGORIES)
+        
+    @property
+    def nlp(self):
+        """Shared spaCy pipeline (without NER), loaded on first use"""
+        return get_nlp("keywords", self.nlp_model)
+        
+    @property
+    def taxonomy(self):
+        """Shared skill taxonomy, reloaded when a new version is published"""
+        return get_taxonomy()
+        
+    @property
+    def technical_skills(self):
+        """Technical skills of the taxonomy"""
+        return self.taxonomy.skills(["technical"])
+        
+    @property
+    def soft_skills(self):
+        """Soft skills of the taxonomy"""
+        return self.taxonomy.skills(["soft"])
+        
+    @property
+    def all_skills(self):
+        """Every skill reported by extract_skills"""
+        return self.taxonomy.skills(self.SKILL_CATEGORIES)
+        
     def extract_keywords(self, text, top_n=30):
         """Extract important keywords from text using NLP techniques"""
-        # Clean and process text
-        text = text.lower()
-        doc = self.nlp(text)
-        
+        return self.extract_keywords_batch([text], top_n=top_n)[0]
+    
+    def extract_keywords_batch(self, texts, top_n=30, batch_size=32, n_process=1):
+        """Extract keywords from many texts, streaming them through nlp.pipe"""
+        # Clean and process text; only the tagger and parser are needed here
+        texts = (text.lower() for text in texts)
+        docs = self.nlp.pipe(texts, batch_size=batch_size, n_process=n_process, disable=self.KEYWORD_DISABLED_PIPES)
+        return [self._keywords_from_doc(doc, top_n) for doc in docs]
+    
+    def _keywords_from_doc(self, doc, top_n):
+        """Rank the keywords of one processed spaCy document"""
         # Extract potential keywords (nouns, proper nouns, adjectives)
         keywords = []
         for token in doc:
@@ -103,71 +76,35 @@ class KeywordExtractor:
         keyword_freq = Counter(keywords)
         
         # Boost frequencies for skills
+        taxonomy = self.taxonomy
         for word, count in list(keyword_freq.items()):
-            if word in self.all_skills:
+            if taxonomy.has_skill(word, self.SKILL_CATEGORIES):
                 keyword_freq[word] = count * 2  # Give higher weight to recognized skills
         
         return keyword_freq.most_common(top_n)
     
     def extract_skills(self, text):
         """Extract skills from text by matching against skill lists"""
-        text = text.lower()
         found_skills = {
             "technical": set(),
             "soft": set()
         }
         
-        # Check for direct matches
-        words = re.findall(r'\b\w+\b', text)
-        for word in words:
-            if word in self.technical_skills:
-                found_skills["technical"].add(word)
-            if word in self.soft_skills:
-                found_skills["soft"].add(word)
-        
-        # Check for multi-word skills
-        doc = self.nlp(text)
-        for skill in self.all_skills:
-            if " " in skill and skill in text:
-                if skill in self.technical_skills:
-                    found_skills["technical"].add(skill)
-                else:
-                    found_skills["soft"].add(skill)
+        # Single-word and multi-word skills (and their aliases) are found in one pass of the
+        # taxonomy's matcher and sorted into their categories
+        taxonomy = self.taxonomy
+        for skill in taxonomy.find(text, self.SKILL_CATEGORIES):
+            for category in taxonomy.categories_of(skill):
+                if category in found_skills:
+                    found_skills[category].add(skill)
         
         return found_skills
     
     def extract_experience_requirements(self, text):
-        """Extract experience requirements from job descriptions"""
-        text = text.lower()
-        experience_reqs = []
-        
-        # Look for patterns kinda like "X years of experience in Y"
-        year_patterns = [
-            r'(\d+\+?\s*(?:year|yr)s?\s*(?:of)?\s*experience\s*(?:in|with)?\s*([^,.;]+))',
-            r'(\d+\+?\s*(?:to|-)\s*\d+\s*(?:year|yr)s?\s*(?:of)?\s*experience\s*(?:in|with)?\s*([^,.;]+))'
-        ]
-        
-        for pattern in year_patterns:
-            matches = re.findall(pattern, text)
-            for match in matches:
-                full_match = match[0]
-                experience_reqs.append(full_match.strip())
-        
-        # Look for general experience phrases
-        for phrase in self.experience_phrases:
-            if phrase in text:
-                # Get the context around the phrase
-                start_idx = text.find(phrase)
-                # Get surrounding text (reasonable context)
-                start = max(0, start_idx - 30)
-                end = min(len(text), start_idx + len(phrase) + 50)
-                context = text[start:end]
-                # Clean up the context
-                context = re.sub(r'\s+', ' ', context).strip()
-                if context not in experience_reqs:
-                    experience_reqs.append(context)
-        
-        return experience_reqs
+        """Extract experience requirements (min/max years and skills) from job descriptions"""
+        # One pass of a precompiled pattern covers both "N years of experience in X" and phrases
+        # such as "proficient in X"
+        return self.experience_parser.requirements(text)
     
     def compare_skills(self, job_skills, resume_skills):
         """Compare job skills against resume skills"""
@@ -0,0 +1,44 @@
+import threading
+
+import spacy
+
+DEFAULT_MODEL = "en_core_web_sm"
+
+# Named pipeline variants and the components excluded when loading them
+PIPELINE_VARIANTS = {
+    "full": [],
+    "keywords": ["ner"],                # tagger, lemmatizer and parser (noun chunks)
+    "tagger": ["parser", "ner"],        # tagger and lemmatizer only
+    "tokenizer": ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "ner", "senter"],
+}
+
+# One instance per (model, variant), shared by every caller in the process
+_models = {}
+_lock = threading.Lock()
+
+
+def get_nlp(variant="full", model_name=DEFAULT_MODEL):
+    """Return the shared spaCy pipeline for a variant, loading it on first use"""
+    if variant not in PIPELINE_VARIANTS:
+        raise ValueError(f"Unknown spaCy pipeline variant: {variant}")
+
+    key = (model_name, variant)
+    nlp = _models.get(key)
+    if nlp is None:
+        with _lock:
+            nlp = _models.get(key)
+            if nlp is None:
+                nlp = spacy.load(model_name, exclude=PIPELINE_VARIANTS[variant])
+                _models[key] = nlp
+    return nlp
+
+
+def warm_up(variants=("keywords",), model_name=DEFAULT_MODEL):
+    """Load the given variants up front and run a short text through each"""
+    for variant in variants:
+        get_nlp(variant, model_name)("Warm up the pipeline.")
+
+
+def loaded_models():
+    """List the (model, variant) pairs loaded so far"""
+    return sorted(_models)
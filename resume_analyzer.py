@@ -1,3 +1,44 @@
+import re
+
+from instrumentation import stage
+
+# Numbers that suggest quantified achievements
+NUMBER_PATTERN = re.compile(r'\b\d+%|\b\d+\b')
+
+
+class ResumeDocument:
+    def __init__(self, text, section_keywords):
+        """A resume split up once: lowercased text, lines, tokens and its section spans shared by the checks"""
+        self.text = text
+        self.lower = text.lower()
+        self.lines = self.lower.split("\n")
+        self.tokens = self.lower.split()
+        self.token_set = set(self.tokens)
+        # Pieces between single spaces, for words that must be surrounded by spaces
+        self.space_fields = set(self.lower.split(" "))
+        self.sections = self._segment(section_keywords)
+
+    def _segment(self, section_keywords):
+        """Split the resume into (offset, length, section_type) spans, one per section header"""
+        # A header is a line (after the first) that is a section keyword and ends with a newline,
+        # or whose text before a colon is one. Each span runs from its header line to the next one.
+        # Lowercasing never moves a newline, so offsets are computed on the original lines.
+        header_starts = []
+        offset = 0
+        last_index = len(self.lines) - 1
+        for index, (line, original) in enumerate(zip(self.lines, self.text.split("\n"))):
+            if index > 0:
+                section_type = section_keywords.get(line) if index < last_index else None
+                if section_type is None and ":" in line:
+                    section_type = section_keywords.get(line.split(":", 1)[0])
+                if section_type is not None:
+                    header_starts.append((offset, section_type))
+            offset += len(original) + 1
+
+        ends = [start for start, _ in header_starts[1:]] + [len(self.text)]
+        return [(start, end - start, section_type) for (start, section_type), end in zip(header_starts, ends)]
+
+
 class ResumeAnalyzer:
     def __init__(self):
         """Initialize the resume analyzer with common patterns to look for"""
@@ -41,42 +82,41 @@ class ResumeAnalyzer:
             "languages": ["languages", "language proficiency", "language skills"],
             "interests": ["interests", "hobbies", "activities"]
         }
+        
+        # Header text (lowercased) to the section it starts
+        self.section_keywords = {
+            keyword: section_type
+            for section_type, keywords in self.resume_sections.items()
+            for keyword in keywords
+        }
     
+    @stage("analyze_structure")
     def analyze_structure(self, text):
         """Analyze the structure of a resume and provide suggestions"""
-        sections_found = self._detect_sections(text.lower())
+        document = ResumeDocument(text, self.section_keywords)
+        sections_found = self._detect_sections(document)
         return {
-            "content_suggestions": self._analyze_content(text),
-            "structure_suggestions": self._analyze_structure(sections_found, text),
-            "action_verb_suggestions": self._analyze_action_verbs(text),
-            "length_suggestions": self._analyze_length(text),
-            "bullet_point_suggestions": self._analyze_bullet_points(text),
-            "weak_language_suggestions": self._analyze_weak_language(text),
-            "quantification_suggestions": self._analyze_quantification(text)
+            "content_suggestions": self._analyze_content(document),
+            "structure_suggestions": self._analyze_structure(sections_found, document),
+            "action_verb_suggestions": self._analyze_action_verbs(document),
+            "length_suggestions": self._analyze_length(document),
+            "bullet_point_suggestions": self._analyze_bullet_points(document),
+            "weak_language_suggestions": self._analyze_weak_language(document),
+            "quantification_suggestions": self._analyze_quantification(document)
         }
     
-    def _detect_sections(self, text):
+    def segment_sections(self, text):
+        """Section spans of a resume as (offset, length, section_type), in document order"""
+        return ResumeDocument(text, self.section_keywords).sections
+    
+    def _detect_sections(self, document):
         """Detect which sections are present in the resume"""
         sections_found = {section_type: False for section_type in self.resume_sections}
-        
-        # Check for each section
-        for section_type, keywords in self.resume_sections.items():
-            for keyword in keywords:
-                # Look for section headers (often followed by newlines or colons)
-                if any(pattern in text for pattern in [
-                    f"\n{keyword}\n", 
-                    f"\n{keyword}:", 
-                    f"\n{keyword.upper()}\n", 
-                    f"\n{keyword.upper()}:",
-                    f"\n{keyword.title()}\n",
-                    f"\n{keyword.title()}:"
-                ]):
-                    sections_found[section_type] = True
-                    break
-        
+        for _, _, section_type in document.sections:
+            sections_found[section_type] = True
         return sections_found
     
-    def _analyze_structure(self, sections_found, text):
+    def _analyze_structure(self, sections_found, document):
         """Analyze the structure based on sections found"""
         suggestions = []
         
@@ -88,36 +128,39 @@ class ResumeAnalyzer:
             sections_str = ", ".join(missing_sections).title()
             suggestions.append(f"Your resume appears to be missing these key sections: {sections_str}.")
         
-        # Check for order of sections
+        # Check for order of sections: the first summary header should come before the first experience one
         if sections_found["summary"] and sections_found["experience"]:
-            if text.lower().find("summary") > text.lower().find("experience"):
+            first_offsets = {}
+            for offset, _, section_type in document.sections:
+                first_offsets.setdefault(section_type, offset)
+            if first_offsets["summary"] > first_offsets["experience"]:
                 suggestions.append("Consider placing your Professional Summary before your Work Experience section.")
         
         return suggestions
     
-    def _analyze_content(self, text):
+    def _analyze_content(self, document):
         """Analyze the overall content quality"""
         suggestions = []
         
         # Check for personal pronouns (should be avoided in resumes)
         personal_pronouns = ["i", "me", "my", "mine", "myself", "we", "us", "our", "ours", "ourselves"]
-        if any(f" {pronoun} " in f" {text.lower()} " for pronoun in personal_pronouns):
+        if any(pronoun in document.space_fields for pronoun in personal_pronouns):
             suggestions.append("Avoid using personal pronouns (I, me, my) in your resume. Use action verbs instead.")
         
         # Check for complete contact information
         contact_patterns = ["phone", "email", "linkedin", "@"]
-        found_contacts = [pattern for pattern in contact_patterns if pattern in text.lower()]
+        found_contacts = [pattern for pattern in contact_patterns if pattern in document.lower]
         if len(found_contacts) < 2:
             suggestions.append("Make sure your resume includes complete contact information (phone, email, LinkedIn).")
         
         return suggestions
     
-    def _analyze_action_verbs(self, text):
+    def _analyze_action_verbs(self, document):
         """Analyze the use of action verbs"""
         suggestions = []
         
         # Count action verbs used
-        words = set(text.lower().split())
+        words = document.token_set
         action_verbs_used = [word for word in self.action_verbs if word in words]
         
         if len(action_verbs_used) < 5:
@@ -125,13 +168,12 @@ class ResumeAnalyzer:
         
         return suggestions
     
-    def _analyze_length(self, text):
+    def _analyze_length(self, document):
         """Analyze the length of the resume"""
         suggestions = []
         
-        # Count words
-        words = text.split()
-        word_count = len(words)
+        # Count words (lowercasing never changes where the whitespace is)
+        word_count = len(document.tokens)
         
         if word_count < 300:
             suggestions.append("Your resume seems too short. Consider adding more details about your experience and achievements.")
@@ -139,21 +181,20 @@ class ResumeAnalyzer:
             suggestions.append("Your resume may be too long. Try to keep it concise and focused on the most relevant information.")
         
         # Count lines
-        lines = text.split("\n")
-        line_count = len(lines)
+        line_count = len(document.lines)
         
         if line_count > 60:
             suggestions.append("Your resume appears to exceed 2 pages. Consider condensing it to make it more focused.")
         
         return suggestions
     
-    def _analyze_bullet_points(self, text):
+    def _analyze_bullet_points(self, document):
         """Analyze the use of bullet points"""
         suggestions = []
         
         # Count bullet points (common bullet point characters)
         bullet_chars = ["•", "-", "*", "–", "—", ">"]
-        bullet_count = sum(text.count(char) for char in bullet_chars)
+        bullet_count = sum(document.text.count(char) for char in bullet_chars)
         
         if bullet_count < 10:
             suggestions.append("Use more bullet points to make your achievements and responsibilities easy to scan.")
@@ -162,13 +203,12 @@ class ResumeAnalyzer:
         
         return suggestions
     
-    def _analyze_weak_language(self, text):
+    def _analyze_weak_language(self, document):
         """Analyze for weak language that should be avoided"""
         suggestions = []
         
         # Check for weak phrases
-        text_lower = text.lower()
-        found_weak_phrases = [phrase for phrase in self.weak_words if phrase in text_lower]
+        found_weak_phrases = [phrase for phrase in self.weak_words if phrase in document.lower]
         
         if found_weak_phrases:
             phrases_str = ", ".join([f"'{phrase}'" for phrase in found_weak_phrases[:3]])
@@ -178,15 +218,18 @@ class ResumeAnalyzer:
         
         return suggestions
     
-    def _analyze_quantification(self, text):
+    def _analyze_quantification(self, document):
         """Analyze for quantifiable achievements"""
         suggestions = []
         
-        # Look for numbers (indicates quantified achievements)
-        import re
-        numbers = re.findall(r'\b\d+%|\b\d+\b', text)
+        # Look for numbers (indicates quantified achievements); five are enough to stop looking
+        numbers = 0
+        for _ in NUMBER_PATTERN.finditer(document.text):
+            numbers += 1
+            if numbers == 5:
+                break
         
-        if len(numbers) < 5:
+        if numbers < 5:
             suggestions.append("Quantify your achievements with numbers where possible (e.g., 'increased sales by 20%', 'managed a team of 15').")
         
         return suggestions
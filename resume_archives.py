@@ -0,0 +1,153 @@
+import os
+import tarfile
+import zipfile
+
+# Resume formats read from an archive; other members (images, nested archives) are skipped
+RESUME_EXTENSIONS = ('.pdf', '.docx', '.txt')
+
+ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz')
+
+# Default limits on one archive: files in it, bytes of one resume, bytes of all resumes, and
+# the ratio of uncompressed to compressed bytes (checked once RATIO_MIN_SIZE bytes are read,
+# so a handful of well-compressed text files is not mistaken for a bomb)
+MAX_MEMBERS = 5000
+MAX_MEMBER_SIZE = 20 * 1024 * 1024
+MAX_TOTAL_SIZE = 1024 * 1024 * 1024
+MAX_RATIO = 100
+RATIO_MIN_SIZE = 1024 * 1024
+
+_CHUNK_SIZE = 64 * 1024
+
+
+class ArchiveError(ValueError):
+    """An archive that cannot be read or exceeds one of the ingestion limits"""
+
+
+def is_archive(filename):
+    """Whether an uploaded file name is a supported archive"""
+    return (filename or '').lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def is_resume_member(name):
+    """Whether an archive member is a resume: a supported format and not OS metadata"""
+    basename = os.path.basename(name)
+    return (
+        name.lower().endswith(RESUME_EXTENSIONS) and not basename.startswith('.')
+        and not name.startswith('__MACOSX/')
+    )
+
+
+def iter_archive(stream, filename, max_members=MAX_MEMBERS, max_member_size=MAX_MEMBER_SIZE,
+                 max_total_size=MAX_TOTAL_SIZE, max_ratio=MAX_RATIO):
+    """Yield (member name, bytes) for each resume in a ZIP or tar archive, one member at a time"""
+    # Members are read from the upload stream into memory one by one and never written to disk.
+    # ArchiveError is raised as soon as a limit is exceeded, after the members already yielded.
+    limits = _Limits(max_members, max_member_size, max_total_size, max_ratio)
+    if filename.lower().endswith('.zip'):
+        yield from _iter_zip(stream, limits)
+    else:
+        yield from _iter_tar(stream, limits)
+
+
+class _Limits:
+    def __init__(self, max_members, max_member_size, max_total_size, max_ratio):
+        """Running totals of one archive checked against the ingestion limits"""
+        self.max_members = max_members
+        self.max_member_size = max_member_size
+        self.max_total_size = max_total_size
+        self.max_ratio = max_ratio
+        self.members = 0
+        self.total_size = 0
+
+    def add_member(self, name, declared_size):
+        self.members += 1
+        if self.max_members is not None and self.members > self.max_members:
+            raise ArchiveError(f"The archive has more than {self.max_members} files.")
+        if self.max_member_size is not None and declared_size > self.max_member_size:
+            raise ArchiveError(f"{name} is larger than {self.max_member_size} bytes uncompressed.")
+
+    def read(self, name, file):
+        """Read one member, stopping as soon as it (or the archive) outgrows its limit"""
+        chunks = []
+        size = 0
+        while True:
+            chunk = file.read(_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            self.total_size += len(chunk)
+            # Sizes in archive headers can lie, so the bytes actually read are what count
+            if self.max_member_size is not None and size > self.max_member_size:
+                raise ArchiveError(f"{name} is larger than {self.max_member_size} bytes uncompressed.")
+            if self.max_total_size is not None and self.total_size > self.max_total_size:
+                raise ArchiveError(f"The archive holds more than {self.max_total_size} bytes uncompressed.")
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def check_ratio(self, compressed_size):
+        if self.max_ratio is None or self.total_size < RATIO_MIN_SIZE:
+            return
+        if self.total_size > self.max_ratio * max(compressed_size, 1):
+            raise ArchiveError(f"The archive expands more than {self.max_ratio} times; it looks like a zip bomb.")
+
+
+def _iter_zip(stream, limits):
+    # The central directory sits at the end of a ZIP, so it needs a seekable stream; uploads
+    # are spooled files, which are
+    try:
+        archive = zipfile.ZipFile(stream)
+    except (zipfile.BadZipFile, OSError) as exc:
+        raise ArchiveError(f"Could not read the ZIP archive: {exc}") from exc
+
+    with archive:
+        members = [info for info in archive.infolist() if not info.is_dir()]
+        if limits.max_members is not None and len(members) > limits.max_members:
+            raise ArchiveError(f"The archive has more than {limits.max_members} files.")
+
+        compressed_size = 0
+        for info in members:
+            # Encrypted members cannot be read without a password
+            if not is_resume_member(info.filename) or info.flag_bits & 0x1:
+                continue
+            limits.add_member(info.filename, info.file_size)
+            try:
+                with archive.open(info) as file:
+                    data = limits.read(info.filename, file)
+            except (zipfile.BadZipFile, zipfile.LargeZipFile, OSError, EOFError) as exc:
+                raise ArchiveError(f"Could not read {info.filename} from the archive: {exc}") from exc
+            compressed_size += info.compress_size
+            limits.check_ratio(compressed_size)
+            yield info.filename, data
+
+
+def _iter_tar(stream, limits):
+    # Stream mode reads the (possibly compressed) tar strictly front to back
+    counted = _CountingReader(stream)
+    try:
+        archive = tarfile.open(fileobj=counted, mode='r|*')
+    except (tarfile.TarError, OSError, EOFError) as exc:
+        raise ArchiveError(f"Could not read the tar archive: {exc}") from exc
+
+    with archive:
+        try:
+            for member in archive:
+                if not member.isfile() or not is_resume_member(member.name):
+                    continue
+                limits.add_member(member.name, member.size)
+                data = limits.read(member.name, archive.extractfile(member))
+                limits.check_ratio(counted.bytes_read)
+                yield member.name, data
+        except (tarfile.TarError, OSError, EOFError) as exc:
+            raise ArchiveError(f"Could not read the tar archive: {exc}") from exc
+
+
+class _CountingReader:
+    def __init__(self, stream):
+        """File wrapper counting the compressed bytes read from an upload"""
+        self.stream = stream
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = self.stream.read(size)
+        self.bytes_read += len(data)
+        return data
@@ -0,0 +1,629 @@
+import os
+import re
+import threading
+from collections import Counter, deque
+import numpy as np
+from skill_taxonomy import get_taxonomy
+from nlp_models import get_nlp
+from analysis_cache import AnalysisCache, content_key, stream_key
+from text_extraction import MAX_TEXT_CHARS, PDF_MAX_PAGES, ExtractionPool
+from resume_analyzer import ResumeAnalyzer
+from formatting_suggestions import FormattingAnalyzer
+from experience_parser import ExperienceParser
+from batch_scoring import ALIGNMENT_FACTORS, BatchScorer, as_percentages, score_weights
+from tfidf_model import TfidfModel, term_counts, terms_row, text_terms
+from instrumentation import stage, timed
+
+# Settings of the scoring pipeline shared by the web app and batch_score.py. The web app adds
+# them to app.config and passes that to use_config, so they can be changed there at runtime.
+config = {}
+
+# Batch NLP settings for nlp.pipe (n_process > 1 spreads a batch across cores)
+config['NLP_BATCH_SIZE'] = 32
+config['NLP_N_PROCESS'] = 1
+
+# Resume-side analysis cache, keyed by a hash of the uploaded bytes. The SQLite tier is
+# optional and only enabled when ANALYSIS_CACHE_PATH is set.
+config['ANALYSIS_CACHE_SIZE'] = 256
+config['ANALYSIS_CACHE_PATH'] = os.environ.get('ANALYSIS_CACHE_PATH')
+config['ANALYSIS_CACHE_MAX_BYTES'] = 256 * 1024 * 1024
+
+# Resumes are extracted concurrently, with a per-file timeout in seconds
+config['EXTRACTION_WORKERS'] = min(4, os.cpu_count() or 1)
+config['EXTRACTION_TIMEOUT'] = 30
+
+# Extraction budget per resume: PDF pages read and characters kept. Resumes cut short by it are
+# flagged as truncated in the results.
+config['PDF_MAX_PAGES'] = int(os.environ.get('PDF_MAX_PAGES', PDF_MAX_PAGES))
+config['MAX_TEXT_CHARS'] = int(os.environ.get('MAX_TEXT_CHARS', MAX_TEXT_CHARS))
+
+# Optional TF-IDF cosine component of the weighted score. Its document frequencies are fitted
+# incrementally on job descriptions and indexed resumes and persisted to TFIDF_MODEL_PATH.
+# Off by default; raising it scales the other components down so the weights still sum to 1.
+config['SEMANTIC_WEIGHT'] = float(os.environ.get('SEMANTIC_WEIGHT', 0))
+# All component weights at once, e.g. SCORE_WEIGHTS=skills=0.4,domain=0.1,experience=0.2,
+# education=0.1,semantic=0.2 (they must sum to 1); overrides SEMANTIC_WEIGHT
+config['SCORE_WEIGHTS'] = os.environ.get('SCORE_WEIGHTS')
+config['TFIDF_MODEL_PATH'] = os.environ.get('TFIDF_MODEL_PATH', os.path.join('instance', 'tfidf.npz'))
+
+# Resume sections that skills are matched in, e.g. SKILL_SECTIONS=skills,experience. Unset
+# means the whole resume; resumes with none of these sections also fall back to the whole text.
+# The setting is part of the analysis cache key, so changing it never returns stale skills.
+config['SKILL_SECTIONS'] = tuple(
+    section.strip() for section in os.environ.get('SKILL_SECTIONS', '').split(',') if section.strip()
+) or None
+
+def use_config(mapping):
+    """Read the pipeline settings from mapping (e.g. a Flask app.config holding these keys) from now on"""
+    global config
+    config = mapping
+
+analysis_cache = AnalysisCache(
+    max_entries=config['ANALYSIS_CACHE_SIZE'],
+    db_path=config['ANALYSIS_CACHE_PATH'],
+    max_db_bytes=config['ANALYSIS_CACHE_MAX_BYTES']
+)
+
+extraction_pool = ExtractionPool(
+    max_workers=config['EXTRACTION_WORKERS'],
+    timeout=config['EXTRACTION_TIMEOUT'],
+    max_pages=config['PDF_MAX_PAGES'],
+    max_chars=config['MAX_TEXT_CHARS']
+)
+
+structure_analyzer = ResumeAnalyzer()
+formatting_analyzer = FormattingAnalyzer()
+experience_parser = ExperienceParser()
+
+# Weights of the components of the weighted similarity score
+SCORE_WEIGHTS = score_weights(config['SCORE_WEIGHTS'], config['SEMANTIC_WEIGHT'])
+
+# Define domain-specific keywords for software engineering
+SOFTWARE_ENGINEERING_DOMAIN = {
+    'software', 'developer', 'engineer', 'programming', 'code', 'java', 'python', 'c++',
+    'algorithm', 'data structure', 'backend', 'frontend', 'full stack', 'api', 'cloud',
+    'devops', 'agile', 'scrum', 'version control', 'git', 'database', 'sql', 'nosql',
+    'machine learning', 'ai', 'computer vision', 'nlp', 'web development', 'mobile development'
+}
+
+# Phrases behind the experience and education factors of the weighted score
+EXPERIENCE_TERMS = ('intern', 'experience')
+EDUCATION_TERMS = ('computer science', 'software engineering')
+
+# Taxonomy categories of the skills compared in the match score (see skill_taxonomy.json)
+SCORING_CATEGORIES = ('scoring',)
+
+# Scores whole batches of resumes with array operations (same results as the per-pair score)
+BATCH_SCORER = BatchScorer(SCORE_WEIGHTS, SOFTWARE_ENGINEERING_DOMAIN, EXPERIENCE_TERMS, EDUCATION_TERMS)
+
+def extract_keywords(text, top_n=20):
+    """Extract important keywords from text using spaCy"""
+    return extract_keywords_batch([text], top_n=top_n, n_process=1)[0]
+
+def extract_keywords_batch(texts, top_n=20, batch_size=None, n_process=None):
+    """Extract keywords from many texts, streaming them through nlp.pipe"""
+    batch_size = batch_size or config['NLP_BATCH_SIZE']
+    n_process = n_process or config['NLP_N_PROCESS']
+    # texts may be a generator: it is read once here, so measuring it cannot consume the input
+    texts = list(texts)
+    with timed("extract_keywords", sum(len(text) for text in texts)):
+        # The "keywords" variant keeps the tagger, lemmatizer and parser (for noun chunks) but not NER
+        docs = get_nlp("keywords").pipe(texts, batch_size=batch_size, n_process=n_process)
+        return [_keywords_from_doc(doc, top_n) for doc in docs]
+
+def _keywords_from_doc(doc, top_n):
+    """Rank the keywords of one processed spaCy document"""
+    # Enhanced filtering
+    keywords = [
+        token.lemma_.lower() for token in doc
+        if token.pos_ in ["NOUN", "PROPN"]
+        and not token.is_stop
+        and len(token.text) > 2
+        and token.text.lower() not in {'resume', 'cv', 'improvement'}
+    ]
+    
+    # Add multi-word phrases
+    keywords += [
+        chunk.text.lower() for chunk in doc.noun_chunks
+        if len(chunk.text.split()) > 1
+    ]
+    
+    keyword_freq = Counter(keywords)
+    return keyword_freq.most_common(top_n)
+
+@stage("extract_skills")
+def extract_skills(text):
+    """Extract skills from text by matching against the scoring skills of the taxonomy"""
+    # Single-word and multi-word skills (and their aliases) are found in one pass of the taxonomy's matcher
+    found_skills = get_taxonomy().find(text, SCORING_CATEGORIES)
+    return list(found_skills)
+
+def extract_skills_batch(texts):
+    """Extract skills from many texts (no spaCy pipeline is involved)"""
+    return [extract_skills(text) for text in texts]
+
+def analyze_resume_structure(text):
+    """Analyze resume structure and provide suggestions"""
+    suggestions = []
+    
+    # Check length
+    words = text.split()
+    if len(words) < 300:
+        suggestions.append("Your resume seems short. Consider adding more details about your experience and skills.")
+    elif len(words) > 1000:
+        suggestions.append("Your resume is quite lengthy. Consider condensing it to highlight your most relevant experiences.")
+    
+    # Check for bullet points
+    if text.count('•') < 5 and text.count('-') < 5:
+        suggestions.append("Consider using bullet points to make your achievements and responsibilities more readable.")
+    
+    # Check for action verbs
+    action_verbs_count = sum(1 for word in words if word.lower() in ACTION_VERBS)
+    if action_verbs_count < 10:
+        suggestions.append("Add more action verbs (like 'achieved', 'managed', 'developed') to make your accomplishments stand out.")
+    
+    # Check for quantifiable achievements
+    numbers = re.findall(r'\b\d+%|\b\d+\b', text)
+    if len(numbers) < 5:
+        suggestions.append("Try to quantify your achievements with numbers (e.g., 'increased sales by 20%').")
+    
+    return suggestions
+
+class ParsedDocument:
+    """A job description or resume parsed once and shared by the scoring functions"""
+
+    def __init__(self, text, skills=None, **analysis):
+        self.text = text
+        self.lower = text.lower()
+        self.tokens = set(self.lower.split())
+        self.skills = extract_skills(text) if skills is None else skills
+
+        # Document-only analysis results, computed on first use and cacheable by content
+        self._analysis = {name: value for name, value in analysis.items() if value is not None}
+        self.modified = True
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a document from its cached form"""
+        data = dict(data)
+        document = cls(data.pop('text'), skills=data.pop('skills'), **data)
+        document.modified = False
+        return document
+
+    def to_dict(self):
+        """Serializable form holding the text and every analysis computed so far"""
+        return dict(self._analysis, text=self.text, skills=self.skills)
+
+    def _cached(self, name, compute):
+        if name not in self._analysis:
+            self._analysis[name] = compute(self.text)
+            self.modified = True
+        return self._analysis[name]
+
+    @property
+    def truncated(self):
+        """Whether extraction stopped at the page or character budget, so only part of the file was read"""
+        return self._analysis.get('truncated', False)
+
+    @property
+    def keywords(self):
+        """Top keywords, extracted with spaCy on first use"""
+        return self._cached('keywords', extract_keywords)
+
+    @property
+    def alignment(self):
+        """Domain, experience and education factors of the weighted score"""
+        return self._cached('alignment', lambda text: resume_alignment(self))
+
+    @property
+    def experience_requirements(self):
+        """Structured experience requirements of a job description (min/max years and skills)"""
+        return self._cached('experience_requirements', experience_parser.requirements)
+
+    @property
+    def required_years(self):
+        """Years of experience a job description asks for, or None"""
+        return experience_parser.required_years(self.experience_requirements)
+
+    @property
+    def tenure(self):
+        """Months covered by the date ranges of a resume's experience sections, and how many ranges were found"""
+        return self._cached('tenure', lambda text: experience_parser.tenure(text, self.sections))
+
+    @property
+    def tenure_years(self):
+        """Years of tenure from the resume's date ranges, or None if it has none"""
+        tenure = self.tenure
+        return tenure['months'] / 12 if tenure['ranges'] else None
+
+    @property
+    def terms(self):
+        """Hashed term counts of the text as (indices, counts), the input of its TF-IDF vector"""
+        return self._cached('terms', text_terms)
+
+    @property
+    def term_row(self):
+        """Term-count row of the text for TfidfModel.similarities"""
+        return terms_row(self.terms)
+
+    @property
+    def structure_suggestions(self):
+        """Generic structure suggestions from analyze_resume_structure"""
+        return self._cached('structure_suggestions', analyze_resume_structure)
+
+    @property
+    def sections(self):
+        """Section spans as (offset, length, section_type) from ResumeAnalyzer"""
+        return self._cached('sections', structure_analyzer.segment_sections)
+
+    @property
+    def structure(self):
+        """Detailed structural analysis from ResumeAnalyzer"""
+        return self._cached('structure', structure_analyzer.analyze_structure)
+
+    @property
+    def formatting(self):
+        """Formatting suggestions from FormattingAnalyzer"""
+        return self._cached('formatting', formatting_analyzer.analyze_formatting)
+
+
+class AnalysisContext:
+    """Per-request analysis state: the job description is parsed once, each resume once"""
+
+    def __init__(self, job_text):
+        # A job profile's document arrives parsed (and already counted by the TF-IDF model)
+        if isinstance(job_text, ParsedDocument):
+            self.job = job_text
+            return
+        self.job = ParsedDocument(job_text)
+        if SCORE_WEIGHTS['semantic']:
+            get_tfidf_model().partial_fit([job_text])
+
+    def parse_resume(self, resume_text):
+        """Parse a resume so it can be scored against this context's job"""
+        return parse_resumes([resume_text])[0]
+
+    def parse_resumes(self, resume_texts, with_keywords=False):
+        """Parse a batch of resumes using the batch extraction entry points"""
+        return parse_resumes(resume_texts, with_keywords=with_keywords)
+
+    def similarity(self, resume):
+        """Weighted similarity of a parsed resume against the job description"""
+        return calculate_weighted_similarity(self.job, resume)
+
+    def similarities(self, resumes):
+        """Weighted similarity of many parsed resumes, computed as arrays in one pass"""
+        return score_resumes(self.job, resumes)
+
+    def suggestions(self, resume):
+        """Improvement suggestions for a parsed resume against the job description"""
+        return generate_improvement_suggestions(self.job, resume)
+
+    def skill_match(self, resume):
+        """Job skills found in and missing from a parsed resume"""
+        resume_skills = set(resume.skills)
+        matched = sorted(skill for skill in self.job.skills if skill in resume_skills)
+        missing = sorted(skill for skill in self.job.skills if skill not in resume_skills)
+        return matched, missing
+
+
+def parse_resumes(resume_texts, with_keywords=False):
+    """Parse a batch of resumes using the batch extraction entry points"""
+    if config['SKILL_SECTIONS']:
+        sections = [structure_analyzer.segment_sections(text) for text in resume_texts]
+    else:
+        sections = [None] * len(resume_texts)
+    skills = extract_skills_batch([
+        resume_skill_text(text, text_sections) for text, text_sections in zip(resume_texts, sections)
+    ])
+    keywords = extract_keywords_batch(resume_texts) if with_keywords else [None] * len(resume_texts)
+    return [
+        ParsedDocument(text, skills=text_skills, keywords=text_keywords, sections=text_sections)
+        for text, text_skills, text_keywords, text_sections in zip(resume_texts, skills, keywords, sections)
+    ]
+
+def parse_extracted(extracted):
+    """Parse extraction results, remembering which documents the extraction budget cut short"""
+    parsed_resumes = parse_resumes([document['text'] for document in extracted])
+    for document, parsed_resume in zip(extracted, parsed_resumes):
+        if document['truncated']:
+            parsed_resume._analysis['truncated'] = True
+    return parsed_resumes
+
+def resume_skill_text(text, sections=None):
+    """The part of a resume that skills are matched in: its SKILL_SECTIONS spans, or all of it"""
+    wanted = config['SKILL_SECTIONS']
+    if not wanted:
+        return text
+    if sections is None:
+        sections = structure_analyzer.segment_sections(text)
+    
+    # Each span is matched once, so a skill repeated across sections is not counted twice
+    parts = [text[offset:offset + length] for offset, length, section_type in sections if section_type in wanted]
+    return "\n".join(parts) if parts else text
+
+@stage("score_batch", size=lambda args: sum(len(resume.text) for resume in args[1]))
+def score_resumes(job, parsed_resumes):
+    """Weighted similarity of parsed resumes against one parsed job, identical to the per-pair score"""
+    # Resumes without a cached alignment get theirs computed together and remembered
+    pending = [resume for resume in parsed_resumes if 'alignment' not in resume._analysis]
+    if pending:
+        factors = BATCH_SCORER.alignment([resume.lower for resume in pending], [resume.tokens for resume in pending])
+        for resume, row in zip(pending, factors):
+            resume._analysis['alignment'] = dict(zip(ALIGNMENT_FACTORS, (int(value) for value in row)))
+            resume.modified = True
+    
+    alignment = np.array(
+        [[resume.alignment[factor] for factor in ALIGNMENT_FACTORS] for resume in parsed_resumes],
+        dtype=np.float64
+    ).reshape(len(parsed_resumes), len(ALIGNMENT_FACTORS))
+    
+    # Tenure is only needed (and parsed) when the job states the years it requires
+    required_years = job.required_years
+    tenure = None
+    if required_years:
+        tenure = np.array(
+            [np.nan if resume.tenure_years is None else resume.tenure_years for resume in parsed_resumes],
+            dtype=np.float64
+        )
+    
+    # TF-IDF cosine of every resume against the job as one sparse product
+    semantic = None
+    if SCORE_WEIGHTS['semantic'] and parsed_resumes:
+        semantic = get_tfidf_model().similarities(
+            job.term_row, term_counts([resume.text for resume in parsed_resumes])
+        )
+    
+    scores = BATCH_SCORER.score(job.skills, [resume.skills for resume in parsed_resumes], alignment,
+                                semantic=semantic, required_years=required_years, tenure=tenure)
+    return as_percentages(scores)
+
+def _as_document(value):
+    """Accept either raw text or an already parsed document"""
+    if isinstance(value, ParsedDocument):
+        return value
+    return ParsedDocument(value)
+
+def _resume_chars(args):
+    """Document size of a (job, resume) stage call: the resume's length"""
+    resume = args[1]
+    return len(resume.text if isinstance(resume, ParsedDocument) else resume)
+
+@stage("calculate_weighted_similarity", size=_resume_chars)
+def calculate_weighted_similarity(job_text, resume_text):
+    """Calculate a weighted similarity score based on skills, domain, experience, and education"""
+    # Extract skills from job description and resume (parsed once by the caller when possible)
+    job = _as_document(job_text)
+    resume = _as_document(resume_text)
+    job_skills = job.skills
+    resume_skills = resume.skills
+    
+    # Calculate skill overlap (partial matching)
+    skill_overlap = len(set(job_skills).intersection(resume_skills)) / len(job_skills) if job_skills else 0
+    
+    # Domain, experience and education alignment depend on the resume alone
+    alignment = resume.alignment
+    experience = experience_factor(job, resume)
+    
+    # Weighted similarity score
+    weighted_similarity = (
+        SCORE_WEIGHTS['skills'] * skill_overlap + 
+        SCORE_WEIGHTS['domain'] * alignment['domain'] + 
+        SCORE_WEIGHTS['experience'] * experience +  
+        SCORE_WEIGHTS['education'] * alignment['education'] 
+    )
+    
+    # Optional TF-IDF cosine similarity of the full texts
+    if SCORE_WEIGHTS['semantic']:
+        weighted_similarity = weighted_similarity + SCORE_WEIGHTS['semantic'] * semantic_similarity(job, resume)
+    
+    return round(weighted_similarity * 100, 2)
+
+def experience_factor(job_text, resume_text):
+    """Experience component of the score: the share of the job's required years covered by the resume's tenure"""
+    job = _as_document(job_text)
+    resume = _as_document(resume_text)
+    # Capped at 1; without stated years or dated positions it is the resume's experience alignment
+    required_years = job.required_years
+    if required_years:
+        tenure_years = resume.tenure_years
+        if tenure_years is not None:
+            return min(1.0, tenure_years / required_years)
+    return resume.alignment['experience']
+
+def semantic_similarity(job_text, resume_text):
+    """TF-IDF cosine similarity of a job description and a resume"""
+    job = _as_document(job_text)
+    resume = _as_document(resume_text)
+    return float(get_tfidf_model().similarities(job.term_row, term_counts([resume.text]))[0])
+
+def resume_alignment(resume_text):
+    """Resume-only factors of the weighted score: domain, experience and education alignment"""
+    resume = _as_document(resume_text)
+    return {
+        # Check domain alignment (less strict)
+        'domain': 1 if is_domain_aligned(resume, SOFTWARE_ENGINEERING_DOMAIN) else 0,
+        # Check experience and education alignment (new factor)
+        'experience': 1 if any(term in resume.lower for term in EXPERIENCE_TERMS) else 0,
+        'education': 1 if any(term in resume.lower for term in EDUCATION_TERMS) else 0
+    }
+
+def is_domain_aligned(resume_text, domain_keywords):
+    """Check if the resume aligns with the job domain (less strict)"""
+    if isinstance(resume_text, ParsedDocument):
+        resume_tokens = resume_text.tokens
+    else:
+        resume_tokens = set(resume_text.lower().split())
+    domain_overlap = resume_tokens.intersection(domain_keywords)
+    return len(domain_overlap) >= 1  # At least 1 domain-specific keyword
+
+@stage("generate_improvement_suggestions", size=_resume_chars)
+def generate_improvement_suggestions(job_text, resume_text):
+    """Generate suggestions to improve resume based on job description"""
+    suggestions = []
+    job = _as_document(job_text)
+    resume = _as_document(resume_text)
+    
+    # Extract job skills
+    job_skills = job.skills
+    
+    # Extract resume skills
+    resume_skills = resume.skills
+    
+    # Identify missing skills
+    missing_skills = [skill for skill in job_skills if skill not in resume_skills]
+    
+    # Generate skill suggestions
+    if missing_skills:
+        if len(missing_skills) > 5:
+            suggestions.append(f"Consider adding these key skills: {', '.join(missing_skills[:5])}, and others.")
+        else:
+            suggestions.append(f"Consider adding these key skills: {', '.join(missing_skills)}.")
+    
+    # Check domain alignment
+    if not is_domain_aligned(resume, SOFTWARE_ENGINEERING_DOMAIN):
+        suggestions.append("Your resume could better align with the software engineering domain. Consider highlighting relevant technical experience.")
+    
+    # Add structure suggestions
+    structure_suggestions = resume.structure_suggestions
+    suggestions.extend(structure_suggestions)
+    
+    return suggestions
+    
+def load_resume_documents(documents):
+    """Parse (filename, bytes or stream) documents, reusing cached analysis of content seen before"""
+    cache_keys = []
+    parsed_resumes = [None] * len(documents)
+    errors = [None] * len(documents)
+    missing = []
+    context = analysis_cache_context()
+    
+    for index, (filename, source) in enumerate(documents):
+        key = _document_key(filename, source, context)
+        cache_keys.append(key)
+        
+        cached = analysis_cache.get(key)
+        if cached is not None:
+            parsed_resumes[index] = ParsedDocument.from_dict(cached)
+            continue
+        
+        # Read straight from the upload stream, without saving it to disk
+        data = source if isinstance(source, bytes) else source.read()
+        missing.append((index, filename, data))
+    
+    # Extract the cache misses concurrently, then parse them as one batch
+    # Extraction runs in worker processes, so it is timed here as one batch stage
+    with timed("extract_batch", sum(len(data) for _, _, data in missing)):
+        extracted = extraction_pool.extract_many((filename, data) for _, filename, data in missing)
+    parsed_missing = parse_extracted(extracted)
+    for (index, _, _), document, parsed_resume in zip(missing, extracted, parsed_missing):
+        parsed_resumes[index] = parsed_resume
+        if document['error']:
+            errors[index] = document['error']
+            cache_keys[index] = None  # never cache a failed extraction
+    
+    return cache_keys, parsed_resumes, errors
+
+def iter_resume_documents(documents):
+    """Parse (filename, bytes or stream) documents, yielding each one as soon as it is ready"""
+    # Yields (index, filename, cache_key, parsed_resume, error): cache hits as they are found,
+    # extractions in the order they finish. documents may be a lazy iterator (archive members);
+    # it is only read as fast as the extraction pool takes new documents.
+    ready = deque()
+    missing = []
+    context = analysis_cache_context()
+    
+    def cache_misses():
+        for index, (filename, source) in enumerate(documents):
+            key = _document_key(filename, source, context)
+            cached = analysis_cache.get(key)
+            if cached is not None:
+                ready.append((index, filename, key, ParsedDocument.from_dict(cached), None))
+                continue
+            missing.append((index, filename, key))
+            yield filename, (source if isinstance(source, bytes) else source.read())
+    
+    for position, document in extraction_pool.iter_extract(cache_misses()):
+        while ready:
+            yield ready.popleft()
+        index, filename, key = missing[position]
+        if document['error']:
+            key = None  # never cache a failed extraction
+        yield index, filename, key, parse_extracted([document])[0], document['error']
+    while ready:
+        yield ready.popleft()
+
+def collect_resume_documents(documents):
+    """Parse documents like iter_resume_documents; returns filenames, cache keys, parsed resumes and errors"""
+    # Everything is returned in input order
+    records = {}
+    for index, filename, key, parsed_resume, error in iter_resume_documents(documents):
+        records[index] = (filename, key, parsed_resume, error)
+    columns = list(zip(*(records[index] for index in sorted(records))))
+    return tuple(list(column) for column in columns) if columns else ([], [], [], [])
+
+def analysis_cache_context():
+    """Settings cached resume analysis depends on besides the content, as part of its cache key"""
+    # Resume skills come from the taxonomy (hot reloaded) and from the SKILL_SECTIONS spans, and
+    # the text from the extraction budget
+    sections = ",".join(config['SKILL_SECTIONS'] or ())
+    return (
+        f"t{get_taxonomy().version}:s{sections}:"
+        f"p{extraction_pool.max_pages}:c{extraction_pool.max_chars}"
+    )
+
+def _document_key(filename, source, context):
+    if isinstance(source, bytes):
+        return content_key(source, filename, context)
+    return stream_key(source, filename, context)
+
+def load_resume_texts(resume_texts):
+    """Parse pre-extracted resume texts, reusing the cached analysis of texts seen before"""
+    context = analysis_cache_context()
+    cache_keys = [content_key(text.encode('utf-8'), 'resume.text', context) for text in resume_texts]
+    parsed_resumes = [None] * len(resume_texts)
+    missing = []
+    
+    for index, key in enumerate(cache_keys):
+        cached = analysis_cache.get(key)
+        if cached is not None:
+            parsed_resumes[index] = ParsedDocument.from_dict(cached)
+        else:
+            missing.append(index)
+    
+    # Pre-extracted text gets the character budget of extracted files, and the same flag when cut
+    max_chars = extraction_pool.max_chars
+    parsed_missing = parse_resumes([resume_texts[index][:max_chars] for index in missing])
+    for index, parsed_resume in zip(missing, parsed_missing):
+        if max_chars is not None and len(resume_texts[index]) > max_chars:
+            parsed_resume._analysis['truncated'] = True
+        parsed_resumes[index] = parsed_resume
+    
+    return cache_keys, parsed_resumes
+
+def store_resume_analysis(cache_keys, parsed_resumes):
+    """Write new or extended resume analysis back to the cache"""
+    for key, parsed_resume in zip(cache_keys, parsed_resumes):
+        if key is not None and parsed_resume.modified:
+            analysis_cache.put(key, parsed_resume.to_dict())
+            parsed_resume.modified = False
+
+# Incrementally fitted TF-IDF model for the optional semantic score component
+
+_tfidf_model = None
+_tfidf_model_lock = threading.Lock()
+
+def get_tfidf_model():
+    """Return the process-wide TF-IDF model, loading its persisted state on first use"""
+    global _tfidf_model
+    with _tfidf_model_lock:
+        if _tfidf_model is None:
+            _tfidf_model = TfidfModel(config['TFIDF_MODEL_PATH'])
+    return _tfidf_model
+
+ACTION_VERBS = {
+    'achieved', 'improved', 'trained', 'managed', 'created', 'resolved', 'negotiated',
+    'presented', 'developed', 'implemented', 'designed', 'launched', 'increased',
+    'decreased', 'reduced', 'expanded', 'delivered', 'generated', 'led', 'organized',
+    'produced', 'supervised', 'streamlined', 'strengthened', 'transformed'
+}
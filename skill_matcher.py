@@ -0,0 +1,52 @@
+import re
+
+_WORD_CHAR = re.compile(r'\w')
+
+
+def skill_pattern(skills):
+    """Regex source finding every skill on word boundaries; group 1 is the longest skill at a position"""
+    # One zero-width match per word start: the lookahead captures the longest skill starting
+    # there, so overlapping skills ("data analysis" and "analysis") are all found
+    return r'(?<!\w)(?=(' + _trie_regex(skills) + r')(?!\w))'
+
+
+def nested_skills(skills):
+    """Map each skill to the shorter skills that are whole-word prefixes of it"""
+    # A skill that is a whole-word prefix of a longer one ("react" in "react native") is never
+    # the longest match at its position, so it is added whenever the longer one is found
+    nested = {}
+    for skill in skills:
+        prefixes = [
+            skill[:end] for end in range(1, len(skill))
+            if not _WORD_CHAR.match(skill[end]) and skill[:end] in skills
+        ]
+        if prefixes:
+            nested[skill] = prefixes
+    return nested
+
+
+def _trie_regex(words):
+    """Build a regex alternation factored on common prefixes, so matching walks a trie"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = None
+    return _node_regex(trie)
+
+
+def _node_regex(node):
+    is_end = '' in node
+    branches = [re.escape(char) + _node_regex(child) for char, child in sorted(node.items()) if char]
+
+    if not branches:
+        return ''
+    if len(branches) == 1 and not is_end:
+        return branches[0]
+
+    # Greedy optional group: longer skills are tried before the skill ending at this node
+    pattern = '(?:' + '|'.join(branches) + ')'
+    if is_end:
+        pattern += '?'
+    return pattern
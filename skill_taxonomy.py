@@ -0,0 +1,322 @@
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+import threading
+import time
+
+from skill_matcher import nested_skills, skill_pattern
+from sqlite_store import ensure_directory
+
+# Taxonomy source (skills with their categories and aliases) and the compiled artifact that
+# workers memory-map, so every process shares the same page-cache pages instead of building
+# its own sets and trie. A missing or outdated artifact is compiled from the source on first
+# use; publish a new one with: python skill_taxonomy.py [source.json] [artifact.bin]
+TAXONOMY_SOURCE = os.environ.get(
+    'SKILL_TAXONOMY_SOURCE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'skill_taxonomy.json')
+)
+TAXONOMY_PATH = os.environ.get('SKILL_TAXONOMY_PATH', os.path.join('instance', 'skill_taxonomy.bin'))
+
+# Seconds between checks for a new artifact (or an edited source) by get_taxonomy
+RELOAD_INTERVAL = 5
+
+# Artifact layout, little-endian. The header is followed by the category table, the skill
+# table and the form table (skills and aliases, both sorted by UTF-8 bytes), the nested-form
+# array, the regex source and the string blob. Offsets in the tables point into the file.
+MAGIC = b"SKTX"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHIIIIII")   # magic, format, unused, version, categories, skills, forms, nested, pattern bytes
+STRING = struct.Struct("<II")           # offset, length
+SKILL = struct.Struct("<III")           # offset, length, category mask
+FORM = struct.Struct("<IIIII")          # offset, length, skill index, first nested, nested count
+INDEX = struct.Struct("<I")
+
+# Category masks are 32-bit
+MAX_CATEGORIES = 32
+
+# Matched forms resolved to (skill, category mask) pairs kept per process. The table only
+# holds forms actually seen in documents, never the whole taxonomy.
+RESOLVED_FORMS_SIZE = 4096
+
+
+def compile_taxonomy(source_path, artifact_path):
+    """Compile a taxonomy source file into an artifact; returns the taxonomy version"""
+    with open(source_path, encoding="utf-8") as file:
+        source = json.load(file)
+
+    categories = list(source["categories"])
+    if len(categories) > MAX_CATEGORIES:
+        raise ValueError(f"A taxonomy has at most {MAX_CATEGORIES} categories")
+    category_bits = {category: 1 << bit for bit, category in enumerate(categories)}
+
+    skills = {}
+    aliases = {}
+    for name, entry in source["skills"].items():
+        skill = name.strip().lower()
+        if skill in skills:
+            raise ValueError(f"Duplicate skill: {name}")
+        mask = 0
+        for category in entry.get("categories", []):
+            if category not in category_bits:
+                raise ValueError(f"Unknown category {category!r} for skill {name!r}")
+            mask |= category_bits[category]
+        skills[skill] = mask
+        for alias in entry.get("aliases", []):
+            alias = alias.strip().lower()
+            if alias in aliases:
+                raise ValueError(f"Alias {alias!r} is given for both {aliases[alias]!r} and {skill!r}")
+            aliases[alias] = skill
+    for alias in aliases:
+        if alias in skills:
+            raise ValueError(f"Alias {alias!r} is also a skill")
+
+    # Surface forms are what the regex matches; each resolves to a canonical skill
+    forms = dict(aliases)
+    forms.update((skill, skill) for skill in skills)
+    skill_names = sorted(skills, key=lambda skill: skill.encode("utf-8"))
+    form_names = sorted(forms, key=lambda form: form.encode("utf-8"))
+    skill_ids = {skill: index for index, skill in enumerate(skill_names)}
+    form_ids = {form: index for index, form in enumerate(form_names)}
+    nested = nested_skills(frozenset(forms))
+    pattern = skill_pattern(forms).encode("utf-8") if forms else b""
+
+    nested_count = sum(len(prefixes) for prefixes in nested.values())
+    strings_offset = (
+        HEADER.size + STRING.size * len(categories) + SKILL.size * len(skill_names) +
+        FORM.size * len(form_names) + INDEX.size * nested_count + len(pattern)
+    )
+    strings = bytearray()
+
+    def add_string(value):
+        encoded = value.encode("utf-8")
+        offset = strings_offset + len(strings)
+        strings.extend(encoded)
+        return offset, len(encoded)
+
+    output = bytearray(HEADER.pack(
+        MAGIC, FORMAT_VERSION, 0, int(source["version"]), len(categories), len(skill_names),
+        len(form_names), nested_count, len(pattern)
+    ))
+    for category in categories:
+        output += STRING.pack(*add_string(category))
+    for skill in skill_names:
+        output += SKILL.pack(*add_string(skill), skills[skill])
+    nested_ids = []
+    for form in form_names:
+        prefixes = nested.get(form, [])
+        output += FORM.pack(*add_string(form), skill_ids[forms[form]], len(nested_ids), len(prefixes))
+        nested_ids += [form_ids[prefix] for prefix in prefixes]
+    for form_id in nested_ids:
+        output += INDEX.pack(form_id)
+    output += pattern
+    output += strings
+
+    # Write a temporary file and swap it in, so a mapped artifact is never rewritten in place
+    ensure_directory(artifact_path)
+    directory = os.path.dirname(artifact_path)
+    handle, temp_path = tempfile.mkstemp(suffix=".bin", dir=directory or ".")
+    with os.fdopen(handle, "wb") as file:
+        file.write(output)
+    os.replace(temp_path, artifact_path)
+    return int(source["version"])
+
+
+class SkillTaxonomy:
+    def __init__(self, path):
+        """Read-only view of a compiled taxonomy artifact, memory-mapped rather than loaded"""
+        self.path = path
+        with open(path, "rb") as file:
+            stat = os.fstat(file.fileno())
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.file_id = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+        magic, file_format, _, self.version, n_categories, self._n_skills, self._n_forms, n_nested, pattern_size = \
+            HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or file_format != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a skill taxonomy artifact of format {FORMAT_VERSION}")
+
+        # Table offsets within the file
+        self._skills_at = HEADER.size + STRING.size * n_categories
+        self._forms_at = self._skills_at + SKILL.size * self._n_skills
+        self._nested_at = self._forms_at + FORM.size * self._n_forms
+        self._pattern_at = self._nested_at + INDEX.size * n_nested
+        self._pattern_size = pattern_size
+
+        self.categories = tuple(
+            self._string(*STRING.unpack_from(self._map, HEADER.size + STRING.size * index))
+            for index in range(n_categories)
+        )
+        self._category_bits = {category: 1 << bit for bit, category in enumerate(self.categories)}
+        self._compiled = None
+        self._skill_sets = {}
+        self._resolved = {}
+
+    def __len__(self):
+        return self._n_skills
+
+    def __contains__(self, skill):
+        return self._find_skill(skill) is not None
+
+    def mask(self, categories=None):
+        """Category bitmask for a list of category names; None (every skill) has no mask"""
+        if categories is None:
+            return None
+        return sum(self._category_bits[category] for category in categories)
+
+    def categories_of(self, skill):
+        """Categories of a canonical skill, or an empty tuple for unknown skills"""
+        index = self._find_skill(skill)
+        if index is None:
+            return ()
+        mask = SKILL.unpack_from(self._map, self._skills_at + SKILL.size * index)[2]
+        return tuple(category for category in self.categories if mask & self._category_bits[category])
+
+    def has_skill(self, skill, categories=None):
+        """Whether a canonical skill belongs to any of the categories"""
+        index = self._find_skill(skill)
+        if index is None:
+            return False
+        if categories is None:
+            return True
+        return bool(SKILL.unpack_from(self._map, self._skills_at + SKILL.size * index)[2] & self.mask(categories))
+
+    def canonical(self, form):
+        """Canonical skill of a skill name or alias, or None"""
+        index = self._find_form(form)
+        if index is None:
+            return None
+        offset, length, _ = SKILL.unpack_from(self._map, self._skills_at + SKILL.size * self._form_skill(index))
+        return self._string(offset, length)
+
+    def skills(self, categories=None):
+        """Frozen set of the canonical skills in any of the categories, built on first request"""
+        mask = self.mask(categories)
+        skills = self._skill_sets.get(mask)
+        if skills is None:
+            skills = frozenset(
+                self._string(offset, length)
+                for offset, length, skill_mask in SKILL.iter_unpack(
+                    self._map[self._skills_at:self._forms_at]
+                )
+                if mask is None or skill_mask & mask
+            )
+            self._skill_sets[mask] = skills
+        return skills
+
+    def find(self, text, categories=None):
+        """Canonical skills (of any of the categories) mentioned in text, aliases included"""
+        found = set()
+        if not self._n_forms:
+            return found
+
+        mask = self.mask(categories)
+        for match in self._pattern().finditer(text.lower()):
+            for skill, skill_mask in self._resolve(match.group(1)):
+                if mask is None or skill_mask & mask:
+                    found.add(skill)
+
+        return found
+
+    def _pattern(self):
+        # The regex source is stored in the artifact; only re.compile runs in each process
+        if self._compiled is None:
+            self._compiled = re.compile(
+                self._map[self._pattern_at:self._pattern_at + self._pattern_size].decode("utf-8")
+            )
+        return self._compiled
+
+    def _resolve(self, form):
+        """(skill, category mask) of a matched form and of the shorter forms nested in it"""
+        resolved = self._resolved.get(form)
+        if resolved is None:
+            _, _, skill_index, first_nested, nested_count = \
+                FORM.unpack_from(self._map, self._forms_at + FORM.size * self._find_form(form))
+            # Shorter forms that are whole-word prefixes of the match are mentioned as well
+            skill_indices = [skill_index] + [
+                self._form_skill(INDEX.unpack_from(self._map, self._nested_at + INDEX.size * position)[0])
+                for position in range(first_nested, first_nested + nested_count)
+            ]
+            resolved = []
+            for index in skill_indices:
+                offset, length, skill_mask = SKILL.unpack_from(self._map, self._skills_at + SKILL.size * index)
+                resolved.append((self._string(offset, length), skill_mask))
+
+            if len(self._resolved) >= RESOLVED_FORMS_SIZE:
+                self._resolved.clear()
+            self._resolved[form] = resolved
+        return resolved
+
+    def _form_skill(self, index):
+        """Index of the canonical skill of a form"""
+        return FORM.unpack_from(self._map, self._forms_at + FORM.size * index)[2]
+
+    def _string(self, offset, length):
+        return self._map[offset:offset + length].decode("utf-8")
+
+    def _find_skill(self, skill):
+        return self._search(skill, self._skills_at, SKILL, self._n_skills)
+
+    def _find_form(self, form):
+        return self._search(form, self._forms_at, FORM, self._n_forms)
+
+    def _search(self, value, table_at, record, count):
+        """Binary search of a table sorted by the UTF-8 bytes of its strings"""
+        key = value.encode("utf-8")
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            offset, length = record.unpack_from(self._map, table_at + record.size * middle)[:2]
+            current = self._map[offset:offset + length]
+            if current == key:
+                return middle
+            if current < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+
+# The current taxonomy of this process, swapped for a new one when the artifact changes
+_taxonomy = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def get_taxonomy(path=None, source_path=None):
+    """Return the current taxonomy, reloading it when a new artifact has been published"""
+    global _taxonomy, _checked_at
+    path = path or TAXONOMY_PATH
+    source_path = source_path or TAXONOMY_SOURCE
+
+    taxonomy = _taxonomy
+    if taxonomy is not None and taxonomy.path == path and time.monotonic() - _checked_at < RELOAD_INTERVAL:
+        return taxonomy
+
+    with _lock:
+        _checked_at = time.monotonic()
+        if _is_outdated(path, source_path):
+            compile_taxonomy(source_path, path)
+
+        # Readers holding the previous taxonomy keep its mapping until they drop it
+        stat = os.stat(path)
+        if _taxonomy is None or _taxonomy.path != path or \
+                _taxonomy.file_id != (stat.st_ino, stat.st_mtime_ns, stat.st_size):
+            _taxonomy = SkillTaxonomy(path)
+        return _taxonomy
+
+
+def _is_outdated(path, source_path):
+    """Whether the artifact is missing or older than an existing source file"""
+    if not os.path.exists(path):
+        return True
+    return os.path.exists(source_path) and os.path.getmtime(source_path) > os.path.getmtime(path)
+
+
+if __name__ == "__main__":
+    source_path = sys.argv[1] if len(sys.argv) > 1 else TAXONOMY_SOURCE
+    artifact_path = sys.argv[2] if len(sys.argv) > 2 else TAXONOMY_PATH
+    version = compile_taxonomy(source_path, artifact_path)
+    print(f"Compiled taxonomy version {version} to {artifact_path}")
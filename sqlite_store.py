@@ -0,0 +1,23 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+
+
+def ensure_directory(path):
+    """Create the directory of a database (or other data) file if it does not exist yet"""
+    directory = os.path.dirname(path)
+    if directory:
+        # Several workers may start at once
+        os.makedirs(directory, exist_ok=True)
+
+
+@contextmanager
+def connect(db_path):
+    """A connection for one operation, committed as one transaction (rolled back on error) and closed"""
+    # One short-lived connection per operation keeps the stores safe across threads and processes
+    db = sqlite3.connect(db_path, timeout=30)
+    try:
+        with db:
+            yield db
+    finally:
+        db.close()
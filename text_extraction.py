@@ -0,0 +1,247 @@
+import io
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import docx2txt
+import PyPDF2
+
+from instrumentation import stage
+
+# Uploads up to this size stay in memory; larger ones spill to a temporary file
+SPOOL_MAX_SIZE = 4 * 1024 * 1024
+
+# Default extraction budget per document: a long CV or a scanned brochure stops early (the
+# app takes its budget from PDF_MAX_PAGES and MAX_TEXT_CHARS in its config)
+PDF_MAX_PAGES = 10
+MAX_TEXT_CHARS = 100000
+
+
+@contextmanager
+def _open_binary(source):
+    """Yield a binary file object for a path, raw bytes or an already open file"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as file:
+            yield file
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        yield io.BytesIO(source)
+    else:
+        source.seek(0)
+        yield source
+
+
+def iter_pdf_pages(source, max_pages=PDF_MAX_PAGES, max_chars=MAX_TEXT_CHARS, status=None):
+    """Yield the text of each PDF page, stopping once the page or character budget is spent"""
+    # status, when given, is a dict whose 'truncated' is set if the budget cut the document short
+    with _open_binary(source) as file:
+        reader = PyPDF2.PdfReader(file)
+        remaining = max_chars
+        for index, page in enumerate(reader.pages):
+            if (max_pages is not None and index >= max_pages) or (remaining is not None and remaining <= 0):
+                _mark_truncated(status)
+                break
+
+            # Pages without a text layer (scans, images) yield nothing instead of failing
+            text = page.extract_text() or ""
+            if remaining is not None:
+                if len(text) > remaining:
+                    _mark_truncated(status)
+                text = text[:remaining]
+                remaining -= len(text)
+
+            yield text
+
+def _mark_truncated(status):
+    if status is not None:
+        status['truncated'] = True
+
+def _within_budget(text, max_chars, status):
+    if max_chars is not None and len(text) > max_chars:
+        _mark_truncated(status)
+        return text[:max_chars]
+    return text
+
+def extract_text_from_pdf(source, max_pages=PDF_MAX_PAGES, max_chars=MAX_TEXT_CHARS):
+    return "".join(iter_pdf_pages(source, max_pages=max_pages, max_chars=max_chars))
+
+def extract_text_from_docx(source):
+    # docx2txt accepts a path or any seekable file object (it opens the document as a zip)
+    if isinstance(source, (str, os.PathLike)):
+        return docx2txt.process(source)
+    with _open_binary(source) as file:
+        return docx2txt.process(file)
+
+def extract_text_from_txt(source):
+    with _open_binary(source) as file:
+        text = file.read().decode('utf-8', errors='ignore')
+    # Same newline handling as reading the file in text mode
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+def iter_text(source, filename=None, max_chars=MAX_TEXT_CHARS, max_pages=PDF_MAX_PAGES, status=None):
+    """Yield the text of a document in pieces (one per page for PDFs) within the page and character budget"""
+    if filename is None:
+        filename = os.fspath(source) if isinstance(source, (str, os.PathLike)) else ""
+    filename = filename.lower()
+
+    if filename.endswith('.pdf'):
+        yield from iter_pdf_pages(source, max_pages=max_pages, max_chars=max_chars, status=status)
+    elif filename.endswith('.docx'):
+        yield _within_budget(extract_text_from_docx(source), max_chars, status)
+    elif filename.endswith('.txt'):
+        yield _within_budget(extract_text_from_txt(source), max_chars, status)
+
+def _source_size(args):
+    """Byte size of an in-memory source (paths and streams are not measured)"""
+    return len(args[0]) if isinstance(args[0], (bytes, bytearray, memoryview)) else 0
+
+@stage("extract_text", size=_source_size)
+def extract_text(source, filename=None, max_chars=MAX_TEXT_CHARS, max_pages=PDF_MAX_PAGES, status=None):
+    """Extract text from a path, bytes or file object; filename decides the format"""
+    # status, when given, is a dict whose 'truncated' is set if the budget cut the document short
+    return "".join(iter_text(source, filename, max_chars=max_chars, max_pages=max_pages, status=status))
+
+
+# Pool workers are started from a fork server (spawned where there is none) rather than forked
+# from the threaded web process, which could copy locks held by other threads into them. The
+# server preloads this module, so each new pool starts without importing the PDF/DOCX readers.
+_POOL_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+if _POOL_CONTEXT.get_start_method() == "forkserver":
+    _POOL_CONTEXT.set_forkserver_preload([__name__])
+
+
+def _extract_document(data, filename, max_pages, max_chars):
+    """Pool task: extract one document from its raw bytes; returns (text, truncated)"""
+    status = {'truncated': False}
+    text = extract_text(data, filename, max_chars=max_chars, max_pages=max_pages, status=status)
+    return text, status['truncated']
+
+
+class ExtractionPool:
+    def __init__(self, max_workers=None, timeout=30, max_pages=PDF_MAX_PAGES, max_chars=MAX_TEXT_CHARS):
+        """Extract documents concurrently in a bounded process pool, each within a timeout"""
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.timeout = timeout
+        # Extraction budget per document; results say whether it cut a document short
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+
+        # One pool is started on first use and shared by every call (from any thread). It is only
+        # replaced when a document runs past its timeout, as that worker cannot be freed otherwise.
+        self._pool = None
+        self._generation = 0
+        # Deadlines of the tasks running in the current pool, at most max_workers of them: a
+        # task is only submitted when a worker is free, so its deadline counts from its start
+        self._running = {}
+        self._tasks = itertools.count()
+        self._condition = threading.Condition()
+
+    def extract_many(self, documents):
+        """Extract text from (filename, data) pairs, returning results in input order"""
+        # Each result carries its own 'error' instead of raising, so one bad file cannot sink the batch
+        documents = list(documents)
+        results = [None] * len(documents)
+        for position, result in self._extract_pooled(iter(documents), self.max_workers * 2):
+            results[position] = result
+        return results
+
+    def iter_extract(self, documents, window=None):
+        """Yield (position, result) for (filename, data) pairs as soon as each extraction finishes"""
+        # documents may be a lazy iterator (an archive being read); at most window documents are
+        # pulled from it ahead of the finished ones, so a large upload is never held in memory whole
+        yield from self._extract_pooled(iter(documents), window or self.max_workers * 2)
+
+    def _extract_pooled(self, documents, window):
+        """Yield (position, result) for documents extracted in the shared pool, each within its own timeout"""
+        # When any caller finds a task past its deadline, the pool is replaced: that caller's
+        # expired documents are reported as timed out, and every caller submits its documents
+        # that had not finished yet to the new pool, with fresh deadlines
+        finished = deque()
+        waiting = deque()
+        pending = {}
+        positions = itertools.count()
+
+        while True:
+            for filename, data in itertools.islice(documents, max(window - len(pending) - len(waiting), 0)):
+                waiting.append((next(positions), filename, data))
+
+            results = []
+            stale_pool = None
+            with self._condition:
+                while True:
+                    now = time.monotonic()
+                    if any(deadline <= now for deadline in self._running.values()):
+                        stale_pool, self._pool = self._pool, None
+                        self._generation += 1
+                        self._running.clear()
+                        self._condition.notify_all()
+
+                    while finished:
+                        task, value, error = finished.popleft()
+                        if task in pending:
+                            position, filename = pending.pop(task)[:2]
+                            results.append((position, self._collect(filename, value, error)))
+
+                    lost = sorted(
+                        (entry for task, entry in pending.items() if entry[4] != self._generation), reverse=True
+                    )
+                    for position, filename, data, deadline, generation in lost:
+                        if deadline <= now:
+                            results.append((position, self._timed_out(filename)))
+                        else:
+                            waiting.appendleft((position, filename, data))
+                    pending = {task: entry for task, entry in pending.items() if entry[4] == self._generation}
+
+                    while waiting and len(self._running) < self.max_workers:
+                        self._submit(waiting.popleft(), pending, finished, now)
+
+                    if results or stale_pool is not None or not (pending or waiting):
+                        break
+                    deadlines = self._running.values()
+                    self._condition.wait(max(min(deadlines) - now, 0) if deadlines else None)
+
+            # Terminating joins the pool's result thread, which may be waiting for the condition
+            if stale_pool is not None:
+                stale_pool.terminate()
+            yield from sorted(results)
+            if not (results or pending or waiting):
+                return
+
+    def _submit(self, document, pending, finished, now):
+        # Called with the condition held
+        position, filename, data = document
+        task = next(self._tasks)
+        deadline = now + self.timeout
+        self._running[task] = deadline
+        pending[task] = (position, filename, data, deadline, self._generation)
+        if self._pool is None:
+            self._pool = _POOL_CONTEXT.Pool(self.max_workers)
+        self._pool.apply_async(
+            _extract_document, (data, filename, self.max_pages, self.max_chars),
+            callback=lambda value: self._finished(finished, task, value, None),
+            error_callback=lambda error: self._finished(finished, task, None, error)
+        )
+
+    def _finished(self, finished, task, value, error):
+        # Runs on the pool's result thread
+        with self._condition:
+            self._running.pop(task, None)
+            finished.append((task, value, error))
+            self._condition.notify_all()
+
+    def _collect(self, filename, value, error):
+        if error is not None:
+            return self._failed(filename, f"Could not extract text: {error}")
+        text, truncated = value
+        return {'filename': filename, 'text': text, 'error': None, 'truncated': truncated}
+
+    def _timed_out(self, filename):
+        return self._failed(filename, f"Text extraction timed out after {self.timeout} seconds.")
+
+    def _failed(self, filename, error):
+        return {'filename': filename, 'text': "", 'error': error, 'truncated': False}
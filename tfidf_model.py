@@ -0,0 +1,232 @@
+import atexit
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: saves from several processes are not serialized
+    fcntl = None
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+# Term vectors use a fixed hashed feature space, so new documents never need a refit
+TERM_FEATURES = 2 ** 18
+
+_hasher = HashingVectorizer(n_features=TERM_FEATURES, alternate_sign=False, norm=None)
+
+# New documents are saved in one batch this many seconds after the first of them, off the
+# request path; the file is checked for other processes' saves at most this often
+SAVE_DELAY = 10
+RELOAD_INTERVAL = 5
+
+# Digests of the most recent documents kept to skip documents counted before (older ones may
+# be counted again, which only nudges their terms' frequencies)
+MAX_SEEN = 10000
+
+
+def term_counts(texts):
+    """Sparse term-count matrix of texts in the shared hashed feature space"""
+    return _hasher.transform(texts)
+
+
+def text_terms(text):
+    """Term counts of one text as (indices, counts) lists, a compact serializable form"""
+    row = term_counts([text])
+    return row.indices.tolist(), row.data.tolist()
+
+
+def terms_row(terms):
+    """The one-row term-count matrix of text_terms output"""
+    # Indices keep the hasher's order, so weighting the row gives exactly term_counts' result
+    indices, counts = terms
+    return sparse.csr_matrix(
+        (np.array(counts, dtype=np.float64), np.array(indices, dtype=np.int32), np.array([0, len(indices)])),
+        shape=(1, TERM_FEATURES)
+    )
+
+
+class TfidfModel:
+    def __init__(self, path=None):
+        """TF-IDF weighting fitted incrementally: document frequencies grow with each new document"""
+        # Several processes (web workers) may share one file: each keeps the file's counts plus
+        # its own unsaved documents, and a save merges those into whatever the file holds by then
+        self.path = path
+        self.n_docs = 0
+        self._df = np.zeros(TERM_FEATURES, dtype=np.int64)
+        self._seen = {}
+        self._pending = []
+        self._idf = None
+        self._weighted = None
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._save_timer = None
+        self._file_id = None
+        self._checked = time.monotonic()
+
+        if path:
+            self.flush()
+            atexit.register(self.flush)
+
+    def partial_fit(self, texts):
+        """Count the documents the model has not seen yet; returns how many were added"""
+        with self._lock:
+            added = 0
+            for text in texts:
+                digest = _digest(text)
+                if digest in self._seen:
+                    continue
+                present = term_counts([text]).indices
+                self._count(digest, present)
+                if self.path:
+                    self._pending.append((digest, present))
+                added += 1
+
+            if added and self.path and self._save_timer is None:
+                self._save_timer = threading.Timer(SAVE_DELAY, self.flush)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+            return added
+
+    def flush(self):
+        """Merge the unsaved documents into the file and take over what other processes saved"""
+        if not self.path:
+            return
+        with self._save_lock, _file_lock(self.path):
+            with self._lock:
+                pending, self._pending = self._pending, []
+                if self._save_timer is not None:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+
+            n_docs, df, seen = _read_state(self.path)
+            seen = dict.fromkeys(seen)
+            for digest, present in pending:
+                # Another process may have counted the same document since
+                if digest not in seen:
+                    df[present] += 1
+                    n_docs += 1
+                    seen[digest] = None
+            seen = list(seen)[-MAX_SEEN:]
+            if pending:
+                _write_state(self.path, n_docs, df, seen)
+
+            with self._lock:
+                self.n_docs, self._df, self._seen = n_docs, df, dict.fromkeys(seen)
+                self._idf = None
+                self._weighted = None
+                # Documents fitted while the file was being merged stay pending
+                for digest, present in self._pending:
+                    self._count(digest, present)
+                self._file_id = _file_id(self.path)
+                self._checked = time.monotonic()
+
+    def idf(self):
+        """Smoothed inverse document frequencies, as computed by sklearn's TfidfTransformer"""
+        self._reload_if_changed()
+        with self._lock:
+            if self._idf is None:
+                self._idf = np.log((1 + self.n_docs) / (1 + self._df)) + 1
+            return self._idf
+
+    def _count(self, digest, present):
+        self._df[present] += 1
+        self.n_docs += 1
+        self._seen[digest] = None
+        if len(self._seen) > MAX_SEEN:
+            del self._seen[next(iter(self._seen))]
+        self._idf = None
+        self._weighted = None
+
+    def _reload_if_changed(self):
+        # Picks up documents other processes saved, at most every RELOAD_INTERVAL seconds
+        if not self.path or time.monotonic() - self._checked < RELOAD_INTERVAL:
+            return
+        self._checked = time.monotonic()
+        if _file_id(self.path) != self._file_id:
+            self.flush()
+
+    def transform(self, texts):
+        """L2-normalized TF-IDF rows for texts"""
+        return self.weight(term_counts(texts))
+
+    def weight(self, counts):
+        """L2-normalized TF-IDF rows for a term-count matrix from term_counts"""
+        return normalize(sparse.csr_matrix(counts.multiply(self.idf())), norm="l2", copy=False)
+
+    def similarities(self, job, counts, cache=False):
+        """Cosine similarity of a job (text or term-count row) to every row of a term-count matrix, as one sparse product"""
+        # With cache, the weighted matrix of a long-lived count matrix (the candidate index) is
+        # kept until the counts or the document frequencies change
+        weighted = self._weighted
+        if weighted is None or weighted[0] is not counts:
+            weighted = (counts, self.weight(counts))
+            if cache:
+                self._weighted = weighted
+        job_vector = self.transform([job]) if isinstance(job, str) else self.weight(job)
+        return np.asarray((weighted[1] @ job_vector.T).todense()).ravel()
+
+
+def _digest(text):
+    # The first 8 bytes of the SHA-256 of a document, as an integer
+    return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+
+
+def _file_id(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+@contextmanager
+def _file_lock(path):
+    """Hold an exclusive lock on a model file (through a sidecar file) across processes"""
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory, exist_ok=True)
+    if fcntl is None:
+        yield
+        return
+    with open(path + ".lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _read_state(path):
+    """(n_docs, document frequencies, seen digests) stored in a model file, or an empty state"""
+    df = np.zeros(TERM_FEATURES, dtype=np.int64)
+    if not os.path.exists(path):
+        return 0, df, []
+    with np.load(path) as stored:
+        df[stored["df_indices"]] = stored["df_counts"]
+        seen = stored["seen"]
+        # Files written before digests were stored as integers hold SHA-256 hex strings
+        if seen.dtype.kind == "U":
+            seen = [int(digest[:16], 16) for digest in seen.tolist()]
+        else:
+            seen = seen.tolist()
+        return int(stored["n_docs"]), df, seen
+
+
+def _write_state(path, n_docs, df, seen):
+    # Write a temporary file and swap it in, so a crash never leaves a half-written model
+    directory = os.path.dirname(path)
+    indices = np.flatnonzero(df)
+    handle, temp_path = tempfile.mkstemp(suffix=".npz", dir=directory or ".")
+    with os.fdopen(handle, "wb") as file:
+        np.savez(
+            file, n_docs=n_docs, df_indices=indices, df_counts=df[indices],
+            seen=np.array(seen, dtype=np.uint64)
+        )
+    os.replace(temp_path, path)